@@ -9,3 +9,9 @@ class ApiConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        """
+        Подключает обработчики сигналов сброса кэша.
+        """
+        import api.signals  # noqa: F401
@@ -0,0 +1,162 @@
+import hashlib
+from time import monotonic, time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from recipes.models import Ingredient
+
+VERSION_KEY = "version:{}"
+STATS_KEY = "stats:{}:{}"
+
+catalogue_version = {"value": None, "expires": 0}
+
+
+def get_api_cache():
+    """
+    Возвращает кэш API, выбранный в настройках.
+    """
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions_cache():
+    """
+    Возвращает общий для всех процессов кэш счётчиков версий.
+    """
+    return caches[settings.API_VERSIONS_CACHE_ALIAS]
+
+
+def get_catalogue_version():
+    """
+    Возвращает версию справочника ингредиентов, вычисленную по базе:
+    количество ингредиентов и время последнего изменения.
+    В отличие от счётчиков в кэше API версия одинакова во всех процессах,
+    в том числе после импорта справочника командой управления.
+    Значение хранится в памяти процесса INGREDIENT_VERSION_TIMEOUT секунд,
+    поэтому запрос к базе выполняется не чаще одного раза за это время,
+    а изменения из других процессов видны с такой же задержкой.
+    """
+    now = monotonic()
+    if catalogue_version["expires"] > now:
+        return catalogue_version["value"]
+    aggregate = Ingredient.objects.aggregate(
+        count=Count("id"), updated_at=Max("updated_at")
+    )
+    updated_at = aggregate["updated_at"]
+    value = (aggregate["count"], updated_at and updated_at.isoformat())
+    catalogue_version.update(
+        value=value, expires=now + settings.INGREDIENT_VERSION_TIMEOUT
+    )
+    return value
+
+
+def reset_catalogue_version():
+    """
+    Сбрасывает сохранённую в памяти процесса версию справочника,
+    чтобы изменения в этом процессе были видны сразу.
+    """
+    catalogue_version["expires"] = 0
+
+
+DB_VERSIONS = {"catalogue": get_catalogue_version}
+
+
+def get_initial_version():
+    """
+    Возвращает начальное значение нового счётчика версий - текущее время
+    в наносекундах, чтобы после очистки или вытеснения счётчика из кэша
+    его значения не повторяли прежние.
+    """
+    return time_ns()
+
+
+def get_versions(*names):
+    """
+    Возвращает текущие значения счётчиков версий
+    для перечисленных имён в виде кортежа.
+    Счётчики хранятся в общем для всех процессов кэше,
+    отсутствующие создаются со значением get_initial_version().
+    Версии из DB_VERSIONS вычисляются по базе, а не берутся из кэша.
+    """
+    keys = [
+        VERSION_KEY.format(name) for name in names if name not in DB_VERSIONS
+    ]
+    versions_cache = get_versions_cache()
+    values = versions_cache.get_many(keys) if keys else {}
+    missing = [key for key in keys if key not in values]
+    if missing:
+        initial = get_initial_version()
+        for key in missing:
+            versions_cache.add(key, initial, timeout=None)
+        values.update(versions_cache.get_many(missing))
+    return tuple(
+        DB_VERSIONS[name]() if name in DB_VERSIONS
+        else values.get(VERSION_KEY.format(name), 0)
+        for name in names
+    )
+
+
+def bump_versions(*names):
+    """
+    Увеличивает счётчики версий для перечисленных имён.
+    Все ключи кэша, построенные на старых версиях, становятся неактуальными.
+    """
+    versions_cache = get_versions_cache()
+    for name in names:
+        key = VERSION_KEY.format(name)
+        versions_cache.add(key, get_initial_version(), timeout=None)
+        try:
+            versions_cache.incr(key)
+        except ValueError:
+            versions_cache.set(key, get_initial_version(), timeout=None)
+
+
+def normalize_query_params(query_params):
+    """
+    Возвращает нормализованное строковое представление параметров запроса:
+    параметры и их значения отсортированы, пустые значения отброшены.
+    Параметр только с пустыми значениями остаётся в виде 'key=',
+    так как его наличие может менять ответ (например, поиск ингредиентов).
+    """
+    return "&".join(
+        f"{key}={','.join(sorted(filter(None, query_params.getlist(key))))}"
+        for key in sorted(query_params)
+    )
+
+
+def make_key(prefix, *parts):
+    """
+    Собирает ключ кэша из префикса и хэша переданных частей.
+    """
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def record_hit(name, hit):
+    """
+    Увеличивает счётчик попаданий или промахов кэша для представления.
+    """
+    api_cache = get_api_cache()
+    key = STATS_KEY.format(name, "hit" if hit else "miss")
+    api_cache.add(key, 0, timeout=None)
+    try:
+        api_cache.incr(key)
+    except ValueError:
+        api_cache.set(key, 1, timeout=None)
+
+
+def get_stats(names):
+    """
+    Возвращает статистику попаданий и промахов кэша по представлениям.
+    """
+    keys = {
+        (name, kind): STATS_KEY.format(name, kind)
+        for name in names
+        for kind in ("hit", "miss")
+    }
+    values = get_api_cache().get_many(keys.values())
+    stats = {}
+    for (name, kind), key in keys.items():
+        stats.setdefault(name, {})[kind] = values.get(key, 0)
+    return stats
@@ -0,0 +1,115 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from api.cache import get_api_cache, get_versions
+from api.readers import build_recipe_cards
+from api.variants import get_srcset
+
+CARD_KEY = "recipe-card:3:{}:{}:{}"
+CARD_VERSIONS = ("tag", "ingredient", "user")
+
+
+def get_card_key(recipe, versions):
+    """
+    Возвращает ключ кэша карточки рецепта.
+    Ключ меняется при изменении рецепта, его тегов и ингредиентов
+    (через дату изменения), а также тегов, ингредиентов
+    и пользователей в целом (через версии).
+    """
+    return CARD_KEY.format(
+        recipe.pk,
+        int(recipe.updated_at.timestamp() * 1000000),
+        "-".join(map(str, versions))
+    )
+
+
+def get_cards(recipes):
+    """
+    Возвращает карточки рецептов из кэша,
+    достраивая и сохраняя в кэш отсутствующие.
+    """
+    api_cache = get_api_cache()
+    versions = get_versions(*CARD_VERSIONS)
+    keys = {recipe.pk: get_card_key(recipe, versions) for recipe in recipes}
+    cached = api_cache.get_many(keys.values())
+    cards = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in keys if pk not in cards]
+    if missing:
+        built = build_recipe_cards(missing)
+        api_cache.set_many(
+            {keys[pk]: card for pk, card in built.items()},
+            settings.RECIPE_CARD_CACHE_TIMEOUT
+        )
+        cards.update(built)
+    return cards
+
+
+def merge_card(card, recipe, request):
+    """
+    Дополняет карточку рецепта флагами текущего пользователя
+    и абсолютной ссылкой на изображение.
+    Порядок полей совпадает с RecipeReadSerializer.
+    """
+    author = dict(card["author"])
+    author["is_subscribed"] = recipe.author_is_subscribed
+    image = card["image"]
+    return {
+        "id": card["id"],
+        "tags": card["tags"],
+        "author": author,
+        "ingredients": card["ingredients"],
+        "is_favorited": recipe.is_favorited,
+        "is_in_shopping_cart": recipe.is_in_shopping_cart,
+        "name": card["name"],
+        "image": request.build_absolute_uri(image) if image else image,
+        "image_srcset": get_srcset(card["image_name"], request),
+        "image_status": card["image_status"],
+        "text": card["text"],
+        "cooking_time": card["cooking_time"],
+    }
+
+
+def render_recipes(recipes, request):
+    """
+    Возвращает представления рецептов, собранные из карточек
+    и флагов текущего пользователя.
+    Рецепты должны быть получены через RecipeQuerySet.with_user_flags.
+    """
+    cards = get_cards(recipes)
+    return [
+        merge_card(cards[recipe.pk], recipe, request)
+        for recipe in recipes
+        if recipe.pk in cards
+    ]
+
+
+class RecipeCardListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка рецептов на основе карточек.
+    Загружает карточки всех рецептов страницы одним обращением к кэшу.
+    """
+
+    def to_representation(self, data):
+        """
+        Возвращает представления рецептов списка.
+        """
+        return render_recipes(list(data), self.context["request"])
+
+
+class RecipeCardReadSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор для чтения рецептов на основе карточек.
+    Возвращает то же представление, что и RecipeReadSerializer.
+    """
+
+    class Meta:
+        """
+        Класс Meta задаёт сериализатор списка рецептов.
+        """
+        list_serializer_class = RecipeCardListSerializer
+
+    def to_representation(self, instance):
+        """
+        Возвращает представление рецепта.
+        """
+        return render_recipes([instance], self.context["request"])[0]
@@ -0,0 +1,57 @@
+import filetype
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64FileField
+from rest_framework import serializers
+
+from api.variants import get_srcset
+
+
+class RawImageField(Base64FileField):
+    """
+    Поле для загрузки изображения без его декодирования в запросе.
+    Принимает строку base64 или файл из multipart/form-data.
+    Формат определяется по сигнатуре в начале файла, а проверка,
+    уменьшение и перекодирование выполняются фоновой задачей
+    (recipes.images.process_image).
+    """
+    ALLOWED_TYPES = ("jpg", "png", "gif", "webp")
+    INVALID_FILE_MESSAGE = "Загрузите корректное изображение."
+    INVALID_TYPE_MESSAGE = "Не удалось определить формат изображения."
+
+    def to_internal_value(self, data):
+        """
+        Возвращает загруженный файл под новым именем
+        с расширением по его формату.
+        Строки обрабатываются как base64.
+        """
+        if not isinstance(data, UploadedFile):
+            return super().to_internal_value(data)
+        extension = self.get_file_extension(data.name, data)
+        if extension not in self.ALLOWED_TYPES:
+            raise serializers.ValidationError(self.INVALID_TYPE_MESSAGE)
+        data.name = f"{self.get_file_name(data)}.{extension}"
+        return serializers.FileField.to_internal_value(self, data)
+
+    def get_file_extension(self, filename, decoded_file):
+        """
+        Возвращает расширение файла по его сигнатуре.
+        """
+        extension = filetype.guess_extension(decoded_file)
+        return "jpg" if extension == "jpeg" else extension
+
+
+class ImageSrcsetField(serializers.Field):
+    """
+    Поле только для чтения со ссылками на уменьшенные копии изображения
+    в формате атрибута srcset.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        """
+        Возвращает значение srcset для файла изображения.
+        """
+        return get_srcset(value.name, self.context.get("request"))
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django_filters.rest_framework import filters, FilterSet
 from rest_framework.filters import SearchFilter
 
+from api.search import (
+    fuzzy_filter,
+    ingredient_index,
+    ingredient_trigrams,
+    recipe_trigrams
+)
 from recipes.models import (
     Ingredient,
     Recipe,
@@ -24,6 +31,46 @@ class SearchIngredientFilter(SearchFilter):
         fields = ("name",)
 
 
+class IngredientIndexFilter(SearchIngredientFilter):
+    """
+    Фильтр поиска ингредиентов по индексу в памяти процесса.
+    Возвращает сначала ингредиенты, название которых начинается
+    с переданной строки, затем содержащие её, без запросов к базе.
+    Если таких нет, выполняет нечёткий поиск по триграммам,
+    чтобы находить ингредиенты по названию с опечатками.
+    При переданном параметре поиска (в том числе пустом) количество
+    результатов ограничено параметром 'limit', но не больше
+    INGREDIENT_AUTOCOMPLETE_LIMIT.
+    Без параметра поиска и вне списка возвращает выборку без изменений.
+    """
+    limit_param = "limit"
+
+    def get_limit(self, request):
+        """
+        Возвращает ограничение количества результатов поиска.
+        """
+        limit = request.query_params.get(self.limit_param, "")
+        max_limit = settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+        if limit.isdigit() and 0 < int(limit) < max_limit:
+            return int(limit)
+        return max_limit
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Возвращает список найденных ингредиентов или исходную выборку.
+        """
+        if (
+            self.search_param not in request.query_params
+            or view.action != "list"
+        ):
+            return queryset
+        query = request.query_params[self.search_param].strip()
+        limit = self.get_limit(request)
+        return ingredient_index.search(query, limit) or fuzzy_filter(
+            queryset, "name", query, ingredient_trigrams, limit
+        )
+
+
 class RecipeFilter(FilterSet):
     """
     Фильтры для модели Recipe.
@@ -41,6 +88,7 @@ class RecipeFilter(FilterSet):
     is_favorited = filters.NumberFilter(
         method="is_favorited_filter"
     )
+    name = filters.CharFilter(method="name_filter")
 
     class Meta:
         """Метакласс 'RecipeFilter'
@@ -52,6 +100,7 @@ class RecipeFilter(FilterSet):
             "is_favorited",
             "author",
             "tags",
+            "name",
         )
 
     def is_in_shopping_cart_filter(self, queryset, name, value):
@@ -71,3 +120,10 @@ class RecipeFilter(FilterSet):
         if value and self.request.user.is_authenticated:
             return queryset.filter(favorites__user=user)
         return queryset
+
+    def name_filter(self, queryset, name, value):
+        """
+        Нечёткий поиск по названию рецепта с учётом опечаток,
+        результаты отсортированы по убыванию сходства.
+        """
+        return fuzzy_filter(queryset, "name", value.strip(), recipe_trigrams)
@@ -0,0 +1,299 @@
+import base64
+import io
+import json
+import os
+import tracemalloc
+from time import perf_counter
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test.client import (
+    BOUNDARY,
+    MULTIPART_CONTENT,
+    encode_multipart
+)
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.cards import merge_card
+from api.fields import RawImageField
+from api.parsers import FastJSONParser, MultiPartJSONParser
+from api.readers import UserReadSerializer, build_recipe_cards
+from api.renderers import FastJSONRenderer
+from api.search import fold, ingredient_index
+from api.serializers import RecipeReadSerializer, UserSerializerCustom
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Команда управления Django для замеров производительности
+    путей чтения API на данных текущей базы.
+    """
+    help = "Сравнивает скорость быстрых и эталонных путей чтения."
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды.
+        """
+        parser.add_argument(
+            "target",
+            choices=sorted(self.get_targets()),
+            help="Что замерять.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Количество объектов в выборке.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Количество повторов замера.",
+        )
+        parser.add_argument(
+            "--image-size",
+            type=int,
+            default=10,
+            help="Размер изображения в мегабайтах для замера загрузки.",
+        )
+
+    def get_targets(self):
+        """
+        Возвращает словарь доступных замеров.
+        """
+        return {
+            "serializers": self.bench_serializers,
+            "json": self.bench_json,
+            "ingredients": self.bench_ingredients,
+            "upload": self.bench_upload,
+        }
+
+    def handle(self, *args, **options):
+        """
+        Метод обработки команды замера.
+        """
+        self.limit = options["limit"]
+        self.repeat = options["repeat"]
+        self.image_size = options["image_size"]
+        self.get_targets()[options["target"]]()
+
+    def get_request(self):
+        """
+        Возвращает запрос анонимного пользователя для контекста сериализаторов.
+        """
+        request = Request(APIRequestFactory().get("/api/"))
+        request.user = AnonymousUser()
+        return request
+
+    def measure(self, label, func):
+        """
+        Выполняет функцию 'repeat' раз и выводит среднее время.
+        Возвращает результат последнего вызова.
+        """
+        start = perf_counter()
+        for _ in range(self.repeat):
+            result = func()
+        elapsed = (perf_counter() - start) / self.repeat * 1000
+        self.stdout.write(f"{label}: {elapsed:.2f} мс")
+        return result
+
+    def compare(self, expected, actual):
+        """
+        Сравнивает JSON-представления результатов и выводит итог.
+        """
+        if json.dumps(expected) != json.dumps(actual):
+            raise CommandError("Результаты различаются.")
+        self.stdout.write(self.style.SUCCESS("Результаты совпадают."))
+
+    def bench_serializers(self):
+        """
+        Сравнивает скорость RecipeReadSerializer и UserSerializerCustom
+        с облегчёнными сериализаторами чтения.
+        Совпадение результатов проверяют тесты api.tests.test_read_serializers.
+        """
+        request = self.get_request()
+        context = {"request": request}
+        recipes = list(
+            Recipe.objects.with_related().with_user_flags(request.user)
+            [:self.limit]
+        )
+        ids = [recipe.pk for recipe in recipes]
+        self.stdout.write(f"Рецептов: {len(recipes)}")
+        self.measure(
+            "RecipeReadSerializer",
+            lambda: RecipeReadSerializer(
+                recipes, many=True, context=context
+            ).data,
+        )
+
+        def lean():
+            cards = build_recipe_cards(ids)
+            return [
+                merge_card(cards[recipe.pk], recipe, request)
+                for recipe in recipes
+            ]
+
+        self.measure("build_recipe_cards", lean)
+        users = list(User.objects.all()[:self.limit])
+        self.stdout.write(f"Пользователей: {len(users)}")
+        self.measure(
+            "UserSerializerCustom",
+            lambda: UserSerializerCustom(
+                users, many=True, context=context
+            ).data,
+        )
+        self.measure(
+            "UserReadSerializer",
+            lambda: UserReadSerializer(
+                users, many=True, context=context
+            ).data,
+        )
+
+    def bench_json(self):
+        """
+        Сравнивает скорость FastJSONRenderer/FastJSONParser
+        со стандартными JSONRenderer/JSONParser.
+        Совместимость вывода проверяют тесты api.tests.test_json.
+        """
+        request = self.get_request()
+        recipes = list(
+            Recipe.objects.with_user_flags(request.user)[:self.limit]
+        )
+        cards = build_recipe_cards([recipe.pk for recipe in recipes])
+        payload = [
+            merge_card(cards[recipe.pk], recipe, request)
+            for recipe in recipes
+        ]
+        self.stdout.write(f"Рецептов: {len(payload)}")
+        content = self.measure(
+            "JSONRenderer", lambda: JSONRenderer().render(payload)
+        )
+        self.measure(
+            "FastJSONRenderer", lambda: FastJSONRenderer().render(payload)
+        )
+        self.measure(
+            "JSONParser", lambda: JSONParser().parse(io.BytesIO(content))
+        )
+        self.measure(
+            "FastJSONParser",
+            lambda: FastJSONParser().parse(io.BytesIO(content)),
+        )
+
+    def bench_ingredients(self):
+        """
+        Сравнивает поиск ингредиентов по началу названия в базе
+        (как SearchFilter с '^name') с индексом в памяти процесса.
+        Запросы - первые 1-3 символа названий 'limit' ингредиентов.
+        Результат индекса сверяется с полным перебором названий,
+        так как ILIKE в SQLite не учитывает регистр кириллицы.
+        """
+        names = dict(Ingredient.objects.values_list("id", "name"))
+        queries = sorted({
+            fold(name[:length])
+            for name in list(names.values())[:self.limit]
+            for length in (1, 2, 3)
+        })
+        self.stdout.write(f"Запросов: {len(queries)}")
+        if not queries:
+            return
+        ingredient_index.ensure_built()
+        self.measure(
+            "База данных",
+            lambda: [
+                list(Ingredient.objects.filter(name__istartswith=query))
+                for query in queries
+            ],
+        )
+        self.measure(
+            "Индекс",
+            lambda: [ingredient_index.search(query) for query in queries],
+        )
+        expected = [
+            sorted(
+                pk for pk, name in names.items()
+                if fold(name).startswith(query)
+            )
+            for query in queries
+        ]
+        actual = [
+            sorted(
+                ingredient.id
+                for ingredient in ingredient_index.search(query)
+                if fold(ingredient.name).startswith(query)
+            )
+            for query in queries
+        ]
+        self.compare(expected, actual)
+
+    def parse_upload(self, body, content_type, parser):
+        """
+        Разбирает тело запроса на создание рецепта и проверяет изображение.
+        Возвращает пиковый объём памяти в мегабайтах и время в миллисекундах.
+        """
+        django_request = APIRequestFactory().generic(
+            "POST", "/api/recipes/", body, content_type
+        )
+        tracemalloc.start()
+        start = perf_counter()
+        request = Request(django_request, parsers=[parser])
+        image = RawImageField().to_internal_value(request.data["image"])
+        elapsed = (perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        image.close()
+        return peak, elapsed
+
+    def bench_upload(self):
+        """
+        Сравнивает пиковую память и время разбора запроса на создание
+        рецепта с изображением в base64 внутри JSON и в multipart/form-data.
+        Тело запроса подготавливается заранее и в замер не входит,
+        как и при чтении тела из сокета сервером.
+        """
+        content = b"\xff\xd8\xff\xe0" + os.urandom(
+            self.image_size * 1024 * 1024
+        )
+        fields = {
+            "name": "Замер",
+            "text": "Замер загрузки изображения",
+            "cooking_time": 1,
+            "tags": [1],
+            "ingredients": [{"id": 1, "amount": 1}],
+        }
+        json_body = FastJSONRenderer().render(dict(
+            fields,
+            image="data:image/jpeg;base64,"
+            + base64.b64encode(content).decode(),
+        ))
+        image = io.BytesIO(content)
+        image.name = "image.jpg"
+        multipart_body = encode_multipart(
+            BOUNDARY,
+            {"data": json.dumps(fields), "image": image},
+        )
+        self.stdout.write(
+            f"Изображение: {len(content) / 1024 / 1024:.1f} МБ, "
+            f"тело JSON: {len(json_body) / 1024 / 1024:.1f} МБ, "
+            f"тело multipart: {len(multipart_body) / 1024 / 1024:.1f} МБ"
+        )
+        for label, body, content_type, parser in (
+            ("JSON + base64", json_body, "application/json",
+             FastJSONParser()),
+            ("multipart/form-data", multipart_body, MULTIPART_CONTENT,
+             MultiPartJSONParser()),
+        ):
+            results = [
+                self.parse_upload(body, content_type, parser)
+                for _ in range(self.repeat)
+            ]
+            peak = max(peak for peak, _ in results)
+            elapsed = sum(elapsed for _, elapsed in results) / len(results)
+            self.stdout.write(
+                f"{label}: пик памяти {peak:.1f} МБ, {elapsed:.2f} мс"
+            )
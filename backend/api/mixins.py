@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.cache import (
+    get_api_cache,
+    get_versions,
+    make_key,
+    normalize_query_params,
+    record_hit
+)
+
+
+class AnonymousCacheMixin:
+    """
+    Миксин кэширования ответов на GET-запросы анонимных пользователей.
+    Ключ кэша включает действие, аргументы URL, нормализованные параметры
+    запроса и версии моделей из 'cache_versions', поэтому изменение
+    любой из этих моделей делает закэшированные ответы неактуальными.
+    """
+    cache_versions = ()
+    cache_timeout = settings.API_CACHE_TIMEOUT
+
+    def get_response_cache_key(self, request):
+        """
+        Возвращает ключ кэша для текущего запроса.
+        """
+        return make_key(
+            f"response:{self.basename}",
+            self.action,
+            sorted(self.kwargs.items()),
+            request.get_host(),
+            normalize_query_params(request.query_params),
+            get_versions(*self.cache_versions),
+        )
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        """
+        Возвращает ответ из кэша или вызывает обработчик
+        и сохраняет данные успешного ответа в кэш.
+        """
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        api_cache = get_api_cache()
+        key = self.get_response_cache_key(request)
+        data = api_cache.get(key)
+        record_hit(self.basename, data is not None)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            api_cache.set(key, response.data, self.cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает список объектов с учётом кэша.
+        """
+        return self.cached_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Возвращает объект с учётом кэша.
+        """
+        return self.cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Миксин условных GET-запросов по ETag.
+    ETag вычисляется из дешёвых данных о версиях до сериализации,
+    поэтому при совпадении с If-None-Match ответ 304
+    отдаётся без обращения к сериализаторам.
+    Если ответы не зависят от пользователя ('user_independent'),
+    ETag общий для всех пользователей, а ответы можно хранить
+    в общих кэшах. 'cache_max_age' задаёт заголовок Cache-Control.
+    """
+    cache_versions = ()
+    user_independent = False
+    cache_max_age = None
+
+    def get_etag_validators(self, request):
+        """
+        Возвращает данные, от которых зависит ответ:
+        действие, аргументы URL, параметры запроса, версии моделей
+        и версию избранного, корзины и подписок текущего пользователя.
+        """
+        validators = [
+            self.action,
+            sorted(self.kwargs.items()),
+            normalize_query_params(request.query_params),
+            get_versions(*self.cache_versions),
+        ]
+        if request.user.is_authenticated and not self.user_independent:
+            validators += [
+                request.user.id,
+                get_versions(f"viewer:{request.user.id}"),
+            ]
+        return validators
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """
+        Возвращает 304, если ETag клиента совпадает с текущим,
+        иначе вызывает обработчик и добавляет ETag к ответу.
+        """
+        etag = quote_etag(
+            make_key("etag", *self.get_etag_validators(request))
+        )
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (
+            etag in parse_etags(if_none_match)
+            or if_none_match.strip() == "*"
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response["ETag"] = etag
+            self.patch_cache_headers(response)
+        return response
+
+    def patch_cache_headers(self, response):
+        """
+        Добавляет к ответу заголовки Cache-Control и Vary,
+        если обработчик не задал Cache-Control сам.
+        """
+        if not self.user_independent:
+            patch_vary_headers(response, ("Authorization",))
+        if self.cache_max_age is None or response.has_header(
+            "Cache-Control"
+        ):
+            return
+        if self.user_independent:
+            patch_cache_control(
+                response, public=True, max_age=self.cache_max_age
+            )
+        else:
+            patch_cache_control(
+                response, private=True, max_age=self.cache_max_age
+            )
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает список объектов с поддержкой If-None-Match.
+        """
+        return self.conditional_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Возвращает объект с поддержкой If-None-Match.
+        """
+        return self.conditional_response(
+            request, super().retrieve, *args, **kwargs
+        )
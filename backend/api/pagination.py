@@ -1,10 +1,360 @@
+from functools import partial
+
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering
+)
+
+from api.cache import get_versions, make_key, normalize_query_params
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATE = "estimate"
+
+
+class ApproximatePage(Page):
+    """
+    Страница пагинатора с приблизительным количеством объектов.
+    Наличие следующей страницы определяется по лишнему объекту выборки,
+    а не по общему количеству.
+    """
+    has_more = False
+
+    def has_next(self):
+        """
+        Возвращает True, если за страницей есть ещё объекты.
+        """
+        return self.has_more
+
+
+class CountingPaginator(Paginator):
+    """
+    Пагинатор Django с настраиваемым способом подсчёта объектов.
+    'exact' - точный COUNT(*),
+    'cached' - точный COUNT(*), закэшированный по ключу 'cache_key'
+    (без ключа - точный COUNT(*) без кэша),
+    'estimate' - оценка планировщика PostgreSQL или COUNT(*)
+    с ограничением сверху, если объектов больше порога.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        count_mode=COUNT_EXACT,
+        cache_timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT,
+        estimate_threshold=settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD,
+        cache_key=None,
+        **kwargs
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_mode = count_mode
+        self.cache_key = cache_key
+        self.cache_timeout = cache_timeout
+        self.estimate_threshold = estimate_threshold
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        """
+        Возвращает количество объектов выбранным способом.
+        Заведомо пустая выборка (например, фильтр по пустому
+        списку id) не имеет SQL-запроса, её количество - ноль.
+        """
+        try:
+            if self.count_mode == COUNT_CACHED and self.cache_key:
+                return self.get_cached_count()
+            if self.count_mode == COUNT_ESTIMATE:
+                return self.get_estimated_count()
+        except EmptyResultSet:
+            return 0
+        return super().count
+
+    def get_cached_count(self):
+        """
+        Возвращает точное количество объектов из кэша
+        или подсчитывает и сохраняет его.
+        """
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(self.cache_key, count, self.cache_timeout)
+        return count
+
+    def get_planner_estimate(self):
+        """
+        Возвращает оценку количества строк планировщиком PostgreSQL
+        или None для других СУБД.
+        """
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = self.object_list.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def get_estimated_count(self):
+        """
+        Возвращает точное количество объектов, если оно не превышает порог,
+        иначе оценку планировщика или значение порога.
+        """
+        estimate = self.get_planner_estimate()
+        if estimate is not None and estimate > self.estimate_threshold:
+            self.count_is_approximate = True
+            return estimate
+        count = self.object_list[:self.estimate_threshold + 1].count()
+        if count > self.estimate_threshold:
+            self.count_is_approximate = True
+            return self.estimate_threshold
+        return count
+
+    def validate_number(self, number):
+        """
+        Проверяет номер страницы.
+        При приблизительном подсчёте не ограничивает номер сверху.
+        """
+        self.count
+        if not self.count_is_approximate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        """
+        Возвращает страницу.
+        При приблизительном подсчёте выбирает на один объект больше,
+        чтобы определить наличие следующей страницы.
+        """
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage("That page contains no results")
+        page = ApproximatePage(objects[:self.per_page], number, self)
+        page.has_more = len(objects) > self.per_page
+        return page
+
+
+class CustomCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация с ограничением количества элементов на странице.
+    Не выполняет подсчёт общего количества объектов и не использует
+    OFFSET, поэтому время получения глубоких страниц постоянно.
+    Позиция курсора составная - значения всех полей сортировки
+    (например, (pub_date, id)), поэтому при уникальном последнем поле
+    объекты с одинаковой датой не требуют смещения внутри позиции.
+    """
+    page_size = settings.SIX_ELEMENTS_ON_PAGE
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    position_separator = "|"
+
+    def _get_position_from_instance(self, instance, ordering):
+        """
+        Возвращает позицию объекта - значения полей сортировки,
+        соединённые через 'position_separator'.
+        """
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = (
+                instance[name] if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            values.append(str(value))
+        return self.position_separator.join(values)
+
+    def get_position_filter(self, queryset, position, reverse):
+        """
+        Возвращает условие выборки объектов после позиции курсора
+        в порядке сортировки (для обратного курсора - до неё):
+        (a, b) < (x, y) раскрывается в a <= x AND (a < x OR a = x AND b < y),
+        чтобы первое условие использовало индекс по полям сортировки.
+        """
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        fields = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            model_field = queryset.model._meta.get_field(name)
+            try:
+                value = model_field.to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            fields.append((name, lookup, value))
+        condition = Q()
+        equal = Q()
+        for name, lookup, value in fields:
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        name, lookup, value = fields[0]
+        return Q(**{f"{name}__{lookup}e": value}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Возвращает страницу выборки после позиции курсора.
+        Повторяет CursorPagination.paginate_queryset,
+        но фильтрует по составной позиции, а не по первому полю.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset, current_position, reverse)
+            )
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        has_current = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next = has_current
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = has_current
+            self.next_position = following_position
+            self.previous_position = current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
 
 
 class CustomPaginLimitOnPage(PageNumberPagination):
     """
     Кастомный класс пагинации с ограничением количества элементов на странице.
+    Способ подсчёта общего количества объектов задаётся атрибутом
+    'count_mode' или атрибутом представления 'pagination_count_mode'.
+    Кэшированное количество хранится для каждой комбинации фильтров
+    и версий моделей представления ('cache_versions'). Если в запросе
+    есть параметры из 'viewer_filter_params' представления (фильтры,
+    зависящие от пользователя), ключ включает id пользователя
+    и версию его избранного, корзины и подписок.
+    Если у представления задан атрибут 'cursor_ordering' и в запросе
+    передан параметр 'cursor' (в том числе пустой), используется
+    курсорная пагинация по указанным полям.
     """
     page_size = settings.SIX_ELEMENTS_ON_PAGE
     page_size_query_param = "limit"
+    cursor_pagination_class = CustomCursorPagination
+    count_mode = COUNT_EXACT
+    count_cache_timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+    count_estimate_threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+    count_cache_key = None
+
+    @property
+    def django_paginator_class(self):
+        """
+        Возвращает пагинатор Django с настроенным способом подсчёта.
+        """
+        return partial(
+            CountingPaginator,
+            count_mode=self.count_mode,
+            cache_timeout=self.count_cache_timeout,
+            estimate_threshold=self.count_estimate_threshold,
+            cache_key=self.count_cache_key,
+        )
+
+    def get_cursor_paginator(self, request, view):
+        """
+        Возвращает курсорный пагинатор, если клиент запросил курсорный режим
+        и представление его поддерживает.
+        """
+        ordering = getattr(view, "cursor_ordering", None)
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if not ordering or cursor_param not in request.query_params:
+            return None
+        paginator = self.cursor_pagination_class()
+        paginator.ordering = ordering
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Разбивает выборку на страницы в номерном или курсорном режиме.
+        """
+        self.cursor_paginator = self.get_cursor_paginator(request, view)
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        self.count_mode = getattr(
+            view, "pagination_count_mode", self.count_mode
+        )
+        if self.count_mode == COUNT_CACHED:
+            self.count_cache_key = self.get_count_cache_key(request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, request, view):
+        """
+        Возвращает ключ кэша количества объектов: представление,
+        действие, аргументы URL, нормализованные параметры запроса
+        без параметров страницы и версии моделей представления.
+        """
+        params = request.query_params.copy()
+        params.pop(self.page_query_param, None)
+        params.pop(self.page_size_query_param, None)
+        parts = [
+            view.basename,
+            view.action,
+            sorted(view.kwargs.items()),
+            normalize_query_params(params),
+            get_versions(*getattr(view, "cache_versions", ())),
+        ]
+        user = request.user
+        if user.is_authenticated and any(
+            param in params
+            for param in getattr(view, "viewer_filter_params", ())
+        ):
+            parts += [user.id, get_versions(f"viewer:{user.id}")]
+        return make_key("pagination-count", *parts)
+
+    def get_paginated_response(self, data):
+        """
+        Возвращает ответ со ссылками на соседние страницы.
+        Если количество объектов приблизительное,
+        добавляет признак 'count_is_approximate'.
+        """
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        response = super().get_paginated_response(data)
+        if self.page.paginator.count_is_approximate:
+            response.data["count_is_approximate"] = True
+        return response
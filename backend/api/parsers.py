@@ -0,0 +1,59 @@
+import json
+
+from django.conf import settings
+from django.utils.datastructures import MultiValueDict
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, JSONParser, MultiPartParser
+
+from api.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON-парсер на основе orjson, если библиотека установлена.
+    Тела в кодировке, отличной от UTF-8, и работа без orjson
+    обрабатываются стандартным JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Разбирает входящий поток JSON и возвращает полученные данные.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MultiPartJSONParser(MultiPartParser):
+    """
+    Парсер multipart/form-data, в котором поля объекта передаются
+    JSON-строкой в части 'data', а файлы - отдельными частями.
+    Файлы записываются на диск по частям обработчиками загрузки
+    из FILE_UPLOAD_HANDLERS и не читаются в память целиком.
+    Формы без части 'data' разбираются как обычно.
+    """
+    json_field = "data"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Разбирает форму и возвращает поля из JSON-части вместе с файлами.
+        """
+        result = super().parse(stream, media_type, parser_context)
+        if self.json_field not in result.data:
+            return result
+        try:
+            data = (orjson or json).loads(result.data[self.json_field])
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+        if not isinstance(data, dict):
+            raise ParseError(
+                f"Часть '{self.json_field}' должна содержать JSON-объект."
+            )
+        data.update(result.files.dict())
+        return DataAndFiles(data, MultiValueDict())
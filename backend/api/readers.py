@@ -0,0 +1,148 @@
+from django.core.files.storage import default_storage
+from django.db import connection
+from rest_framework import serializers
+
+from api.resolvers import UserListSerializer, is_subscribed
+from api.variants import get_srcset
+from recipes.models import IngredientRecipe, Recipe
+
+USER_FIELDS = ("email", "id", "username", "first_name", "last_name")
+TAG_FIELDS = ("id", "name", "color", "slug")
+INGREDIENT_FIELDS = ("id", "name", "measurement_unit", "amount")
+
+RECIPE_VALUES = (
+    "id", "name", "image", "image_status", "text", "cooking_time"
+) + tuple(
+    f"author__{field}" for field in USER_FIELDS
+)
+TAG_VALUES = ("recipe_id",) + tuple(f"tag__{field}" for field in TAG_FIELDS)
+BRIEF_RECIPE_FIELDS = ("id", "name", "image", "cooking_time")
+INGREDIENT_VALUES = (
+    "recipe_id",
+    "ingredient__id",
+    "ingredient__name",
+    "ingredient__measurement_unit",
+    "amount",
+)
+
+
+def image_url(name):
+    """
+    Возвращает относительную ссылку на файл изображения
+    так же, как ImageField в DRF.
+    """
+    return default_storage.url(name) if name else None
+
+
+def build_recipe_cards(recipe_ids):
+    """
+    Строит карточки рецептов из строк values() тремя запросами,
+    без создания объектов моделей и сериализаторов.
+    Результат совпадает с частью представления RecipeReadSerializer,
+    не зависящей от текущего пользователя.
+    """
+    tags = {}
+    for row in Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by("tag__name").values_list(*TAG_VALUES):
+        tags.setdefault(row[0], []).append(dict(zip(TAG_FIELDS, row[1:])))
+    ingredients = {}
+    for row in IngredientRecipe.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by("-id").values_list(*INGREDIENT_VALUES):
+        ingredients.setdefault(row[0], []).append(
+            dict(zip(INGREDIENT_FIELDS, row[1:]))
+        )
+    cards = {}
+    for row in Recipe.objects.filter(
+        pk__in=recipe_ids
+    ).order_by().values_list(*RECIPE_VALUES):
+        recipe_id, name, image, image_status, text, cooking_time = row[:6]
+        cards[recipe_id] = {
+            "id": recipe_id,
+            "tags": tags.get(recipe_id, []),
+            "author": dict(zip(USER_FIELDS, row[6:])),
+            "ingredients": ingredients.get(recipe_id, []),
+            "name": name,
+            "image": image_url(image),
+            "image_name": image,
+            "image_status": image_status,
+            "text": text,
+            "cooking_time": cooking_time,
+        }
+    return cards
+
+
+def get_author_recipes(author_ids, limit=None):
+    """
+    Возвращает последние рецепты каждого автора из списка
+    в кратком представлении (как BriefInfoSerializer) одним запросом
+    с оконной функцией ROW_NUMBER() по автору.
+    'limit' ограничивает число рецептов на автора.
+    Результат - словарь {id автора: [рецепты]}.
+    """
+    recipes = {author_id: [] for author_id in author_ids}
+    if not recipes:
+        return recipes
+    quote = connection.ops.quote_name
+    opts = Recipe._meta
+    columns = ", ".join(
+        quote(opts.get_field(field).column) for field in BRIEF_RECIPE_FIELDS
+    )
+    author = quote(opts.get_field("author").column)
+    placeholders = ", ".join(["%s"] * len(recipes))
+    params = list(recipes)
+    sql = (
+        f"SELECT {author}, {columns} FROM ("
+        f"SELECT {author}, {columns}, ROW_NUMBER() OVER ("
+        f"PARTITION BY {author} "
+        f"ORDER BY {quote(opts.get_field('pub_date').column)} DESC, "
+        f"{quote(opts.pk.column)} DESC) AS row_number "
+        f"FROM {quote(opts.db_table)} WHERE {author} IN ({placeholders})"
+        f") ranked"
+    )
+    if limit is not None:
+        sql += " WHERE row_number <= %s"
+        params.append(limit)
+    sql += " ORDER BY row_number"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for author_id, pk, name, image, cooking_time in cursor.fetchall():
+            recipes[author_id].append({
+                "id": pk,
+                "name": name,
+                "image": image_url(image),
+                "image_srcset": get_srcset(image),
+                "cooking_time": cooking_time,
+            })
+    return recipes
+
+
+class UserReadSerializer(serializers.BaseSerializer):
+    """
+    Облегчённый сериализатор для чтения пользователей.
+    Возвращает то же представление, что и UserSerializerCustom,
+    без механизма полей ModelSerializer.
+    """
+
+    class Meta:
+        """
+        Класс Meta задаёт сериализатор списка пользователей,
+        загружающий подписки на всех пользователей страницы одним запросом.
+        """
+        list_serializer_class = UserListSerializer
+
+    def to_representation(self, instance):
+        """
+        Возвращает представление пользователя.
+        """
+        data = {field: getattr(instance, field) for field in USER_FIELDS}
+        data["is_subscribed"] = self.get_is_subscribed(instance)
+        return data
+
+    def get_is_subscribed(self, obj):
+        """
+        Определяет,
+        подписан ли текущий пользователь на пользователя из контекста запроса.
+        """
+        return is_subscribed(self.context, obj.id)
@@ -0,0 +1,63 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson else None
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на основе orjson, если библиотека установлена.
+    Компактный вывод совпадает побайтно с выводом JSONRenderer
+    для строк, целых чисел, дат, Decimal, UUID, ленивых строк и т.п.:
+    типы, которые orjson не кодирует сам, передаются в кодировщик DRF,
+    а символы U+2028 и U+2029 экранируются.
+    Отличия от JSONRenderer:
+    - числа с плавающей точкой в экспоненциальной записи выводятся
+      без знака и ведущих нулей порядка (1e16 вместо 1e+16);
+    - NaN и бесконечность выводятся как null, а не вызывают ошибку.
+    Данные, которые orjson не может закодировать (например, целые
+    числа больше 64 бит), форматированный вывод (indent), вывод
+    с ensure_ascii и работа без orjson выполняются стандартным
+    JSONRenderer.
+    """
+    encoder = None
+
+    def get_default(self):
+        """
+        Возвращает функцию кодирования типов, неизвестных orjson.
+        """
+        if self.encoder is None:
+            self.encoder = self.encoder_class()
+        return self.encoder.default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Преобразует данные в JSON и возвращает строку байтов.
+        """
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            orjson is None
+            or data is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.get_default(), option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
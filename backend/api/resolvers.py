@@ -0,0 +1,95 @@
+from rest_framework import serializers
+
+from users.models import Subscription
+
+
+class SubscriptionResolver:
+    """
+    Определяет подписки текущего пользователя на авторов
+    в пределах одного запроса.
+    Id авторов, на которых подписан пользователь, загружаются
+    одним запросом на все ещё не проверенные id и запоминаются,
+    поэтому повторные проверки обращений к базе не требуют.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.checked = set()
+        self.subscribed = set()
+
+    @classmethod
+    def for_request(cls, request):
+        """
+        Возвращает резолвер подписок, общий для всего запроса.
+        """
+        resolver = getattr(request, "_subscription_resolver", None)
+        if resolver is None:
+            resolver = cls(request.user)
+            request._subscription_resolver = resolver
+        return resolver
+
+    def prime(self, author_ids):
+        """
+        Загружает подписки на ещё не проверенных авторов одним запросом.
+        """
+        missing = set(author_ids) - self.checked
+        if not missing or not self.user.is_authenticated:
+            return
+        self.subscribed.update(Subscription.objects.filter(
+            user=self.user, author_id__in=missing
+        ).values_list("author_id", flat=True))
+        self.checked |= missing
+
+    def is_subscribed(self, author_id):
+        """
+        Проверяет, подписан ли текущий пользователь на автора.
+        """
+        if not self.user.is_authenticated:
+            return False
+        self.prime((author_id,))
+        return author_id in self.subscribed
+
+
+def is_subscribed(context, author_id):
+    """
+    Проверяет подписку текущего пользователя из контекста сериализатора
+    на автора через резолвер запроса.
+    """
+    request = context.get("request")
+    if request is None:
+        return False
+    return SubscriptionResolver.for_request(request).is_subscribed(author_id)
+
+
+class SubscribedAuthorsListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка, который перед сериализацией загружает
+    подписки текущего пользователя на всех авторов списка одним запросом.
+    Id автора берётся из атрибута объекта 'author_id_attr'.
+    """
+    author_id_attr = "id"
+
+    def to_representation(self, data):
+        """
+        Загружает подписки на авторов списка и возвращает его представление.
+        """
+        items = list(data.all() if hasattr(data, "all") else data)
+        request = self.context.get("request")
+        if request is not None:
+            SubscriptionResolver.for_request(request).prime(
+                getattr(item, self.author_id_attr) for item in items
+            )
+        return super().to_representation(items)
+
+
+class UserListSerializer(SubscribedAuthorsListSerializer):
+    """
+    Сериализатор списка пользователей.
+    """
+
+
+class RecipeAuthorListSerializer(SubscribedAuthorsListSerializer):
+    """
+    Сериализатор списка рецептов с вложенными авторами.
+    """
+    author_id_attr = "author_id"
@@ -0,0 +1,289 @@
+import hashlib
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    FloatField,
+    Func,
+    Value,
+    When
+)
+from django.db.models.functions import Length
+
+from api.cache import get_versions
+from recipes.models import Ingredient, Recipe
+
+MAX_CHAR = chr(0x10FFFF)
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def fold(value):
+    """
+    Приводит строку к виду для сравнения без учёта регистра,
+    в том числе для кириллицы.
+    """
+    return value.casefold()
+
+
+def trigrams(value):
+    """
+    Возвращает множество триграмм строки так же, как pg_trgm:
+    каждое слово приводится к нижнему регистру и дополняется
+    двумя пробелами в начале и одним в конце.
+    """
+    grams = set()
+    for word in WORD_RE.findall(fold(value)):
+        padded = f"  {word} "
+        grams.update(
+            padded[position:position + 3]
+            for position in range(len(padded) - 2)
+        )
+    return grams
+
+
+class VersionedIndex:
+    """
+    Базовый класс индекса в памяти процесса.
+    Индекс строится при первом обращении и перестраивается,
+    когда меняется версия 'version_name' (см. api.cache.get_versions).
+    """
+    version_name = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+
+    def build(self, version):
+        """
+        Строит индекс. Переопределяется в наследниках.
+        """
+        raise NotImplementedError
+
+    def ensure_built(self):
+        """
+        Строит индекс, если он ещё не построен или устарел.
+        """
+        version = get_versions(self.version_name)
+        if self.version == version:
+            return
+        with self.lock:
+            if self.version != version:
+                self.build(version)
+                self.version = version
+
+
+class IngredientIndex(VersionedIndex):
+    """
+    Индекс справочника ингредиентов в памяти процесса для поиска по названию.
+    Ингредиенты хранятся в списке, отсортированном по приведённому
+    к нижнему регистру названию, поэтому совпадения по началу названия
+    находятся двоичным поиском. Для поиска по вхождению названия
+    склеены в одну строку, по которой ищет str.find.
+    Индекс строится при первом поиске и перестраивается,
+    когда меняется версия справочника, вычисленная по базе.
+    Также хранит снимок всего справочника для выдачи клиентам
+    и его хэш, который служит версией справочника.
+    """
+    version_name = "catalogue"
+    separator = "\n"
+
+    def __init__(self):
+        super().__init__()
+        self.keys = []
+        self.ingredients = []
+        self.text = ""
+        self.offsets = []
+        self.snapshot = []
+        self.digest = ""
+
+    def build(self, version):
+        """
+        Загружает справочник ингредиентов и строит индекс.
+        """
+        ingredients = sorted(
+            Ingredient.objects.only("id", "name", "measurement_unit"),
+            key=lambda ingredient: (fold(ingredient.name), ingredient.id),
+        )
+        keys = [fold(ingredient.name) for ingredient in ingredients]
+        offsets = []
+        offset = 0
+        for key in keys:
+            offsets.append(offset)
+            offset += len(key) + len(self.separator)
+        snapshot = [
+            {
+                "id": ingredient.id,
+                "name": ingredient.name,
+                "measurement_unit": ingredient.measurement_unit,
+            }
+            for ingredient in ingredients
+        ]
+        self.keys, self.ingredients = keys, ingredients
+        self.text, self.offsets = self.separator.join(keys), offsets
+        self.snapshot = snapshot
+        self.digest = hashlib.md5(repr(snapshot).encode()).hexdigest()
+
+    def get_snapshot(self):
+        """
+        Возвращает версию справочника и список всех ингредиентов
+        по алфавиту.
+        """
+        self.ensure_built()
+        return self.digest, self.snapshot
+
+    def search(self, query, limit=None):
+        """
+        Возвращает ингредиенты, название которых содержит 'query':
+        сначала совпадения по началу названия, затем остальные,
+        в каждой группе - по алфавиту.
+        'limit' ограничивает количество результатов.
+        """
+        self.ensure_built()
+        keys, ingredients = self.keys, self.ingredients
+        text, offsets = self.text, self.offsets
+        query = fold(query).replace(self.separator, " ")
+        start = bisect_left(keys, query)
+        end = bisect_right(keys, query + MAX_CHAR, lo=start)
+        results = ingredients[start:end]
+        found = text.find(query)
+        while found != -1 and (limit is None or len(results) < limit):
+            position = bisect_right(offsets, found) - 1
+            if not start <= position < end:
+                results.append(ingredients[position])
+            if position + 1 == len(offsets):
+                break
+            found = text.find(query, offsets[position + 1])
+        return results if limit is None else results[:limit]
+
+
+class TrigramIndex(VersionedIndex):
+    """
+    Индекс триграмм текстового поля модели в памяти процесса
+    для нечёткого поиска без pg_trgm (например, на SQLite в тестах).
+    Для каждой триграммы хранится список id объектов.
+    Сходство считается как word_similarity в pg_trgm: доля триграмм
+    запроса, найденных в лучшем отрезке из подряд идущих слов значения.
+    """
+
+    def __init__(self, model, field, version_name):
+        super().__init__()
+        self.model = model
+        self.field = field
+        self.version_name = version_name
+        self.postings = {}
+        self.words = {}
+        self.lengths = {}
+
+    def build(self, version):
+        """
+        Загружает значения поля и строит индекс триграмм.
+        """
+        postings = {}
+        words = {}
+        lengths = {}
+        for pk, value in self.model.objects.values_list(
+            "pk", self.field
+        ).iterator():
+            for gram in trigrams(value):
+                postings.setdefault(gram, []).append(pk)
+            words[pk] = [trigrams(word) for word in WORD_RE.findall(value)]
+            lengths[pk] = len(value)
+        self.postings, self.words, self.lengths = postings, words, lengths
+
+    def word_similarity(self, grams, width, pk):
+        """
+        Возвращает наибольшую долю триграмм запроса среди отрезков
+        значения объекта длиной 'width' слов.
+        """
+        words = self.words[pk]
+        best = 0
+        for start in range(max(len(words) - width, 0) + 1):
+            extent = set().union(*words[start:start + width])
+            best = max(best, len(grams & extent))
+        return best / len(grams)
+
+    def search(self, query, threshold, limit=None):
+        """
+        Возвращает список пар (id, сходство) объектов,
+        сходство которых с 'query' не меньше 'threshold',
+        по убыванию сходства (при равенстве - сначала более короткие).
+        """
+        self.ensure_built()
+        grams = trigrams(query)
+        if not grams:
+            return []
+        width = len(WORD_RE.findall(query))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        ranked = []
+        for pk, count in shared.items():
+            if count / len(grams) < threshold:
+                continue
+            score = self.word_similarity(grams, width, pk)
+            if score >= threshold:
+                ranked.append((pk, score))
+        ranked.sort(
+            key=lambda item: (-item[1], self.lengths[item[0]], item[0])
+        )
+        return ranked if limit is None else ranked[:limit]
+
+
+class TrigramWordMatch(Func):
+    """
+    Оператор pg_trgm '<%': в строке есть отрезок, похожий на запрос,
+    с порогом pg_trgm.word_similarity_threshold.
+    Использует GIN-индекс триграмм.
+    """
+    arg_joiner = " <%% "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class TrigramWordSimilarity(Func):
+    """
+    Функция pg_trgm word_similarity(запрос, строка).
+    """
+    function = "WORD_SIMILARITY"
+    output_field = FloatField()
+
+
+def fuzzy_filter(queryset, field, query, index, limit=None):
+    """
+    Оставляет в выборке объекты, в значении поля 'field' которых
+    есть отрезок, похожий на 'query' не меньше чем
+    на FUZZY_SEARCH_THRESHOLD, и сортирует их по убыванию сходства
+    (аннотация 'similarity'). 'limit' ограничивает количество объектов.
+    На PostgreSQL использует pg_trgm и GIN-индексы триграмм
+    (порог задаётся параметром соединения в настройках DATABASES),
+    на остальных СУБД - индекс триграмм 'index' в памяти процесса.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        queryset = queryset.alias(
+            trigram_match=TrigramWordMatch(Value(query), F(field))
+        ).annotate(
+            similarity=TrigramWordSimilarity(Value(query), F(field))
+        ).filter(
+            trigram_match=True
+        ).order_by("-similarity", Length(field), "pk")
+        return queryset if limit is None else queryset[:limit]
+    ranked = index.search(query, settings.FUZZY_SEARCH_THRESHOLD, limit)
+    return queryset.filter(pk__in=[pk for pk, _ in ranked]).annotate(
+        similarity=Case(
+            *(When(pk=pk, then=Value(score)) for pk, score in ranked),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    ).order_by("-similarity", Length(field), "pk")
+
+
+ingredient_index = IngredientIndex()
+ingredient_trigrams = TrigramIndex(Ingredient, "name", "catalogue")
+recipe_trigrams = TrigramIndex(Recipe, "name", "recipe")
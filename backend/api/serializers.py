@@ -1,9 +1,18 @@
+from collections import Counter
+
+from django.conf import settings
 from django.db import transaction
-from django.shortcuts import get_object_or_404
 from drf_extra_fields.fields import Base64ImageField
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from rest_framework import serializers
 
+from api.fields import ImageSrcsetField, RawImageField
+from api.readers import get_author_recipes
+from api.resolvers import (
+    RecipeAuthorListSerializer,
+    UserListSerializer,
+    is_subscribed
+)
 from api.validators import (
     validate_cooking_time,
     validate_ingredients,
@@ -12,13 +21,13 @@ from api.validators import (
 )
 from users.models import User, Subscription
 from recipes.models import (
+    IMAGE_PENDING,
     IngredientRecipe,
-    ShoppingCart,
     Ingredient,
-    Favorite,
     Recipe,
     Tag
 )
+from recipes.services import sync_recipe_ingredients
 
 
 class UserCreateSerializerCustom(UserCreateSerializer):
@@ -76,6 +85,7 @@ class UserSerializerCustom(UserSerializer):
             "last_name",
             "is_subscribed"
         )
+        list_serializer_class = UserListSerializer
 
     lookup_field = 'username'
 
@@ -84,12 +94,9 @@ class UserSerializerCustom(UserSerializer):
         Определяет,
         подписан ли текущий пользователь на пользователя из контекста запроса.
         """
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return Subscription.objects.filter(
-                user=user, author=obj.id
-            ).exists()
-        return False
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        return is_subscribed(self.context, obj.id)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -121,7 +128,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         и поля которые будут сериализованы.
         """
         model = Ingredient
-        fields = "__all__"
+        fields = ("id", "name", "measurement_unit")
 
 
 class BriefInfoSerializer(serializers.ModelSerializer):
@@ -130,6 +137,7 @@ class BriefInfoSerializer(serializers.ModelSerializer):
     содержащий только базовую информацию.
     """
     image = Base64ImageField()
+    image_srcset = ImageSrcsetField(source="image")
 
     class Meta:
         """
@@ -143,6 +151,7 @@ class BriefInfoSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "image",
+            "image_srcset",
             "cooking_time",
         )
 
@@ -189,6 +198,27 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         )
 
 
+class SubscriptionListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка подписок.
+    Загружает рецепты всех авторов страницы одним запросом.
+    """
+
+    def to_representation(self, data):
+        """
+        Загружает рецепты авторов и возвращает представление подписок.
+        """
+        subscriptions = list(data.all() if hasattr(data, "all") else data)
+        self.child.author_recipes = get_author_recipes(
+            [subscription.author_id for subscription in subscriptions],
+            self.child.get_recipes_limit(),
+        )
+        return [
+            self.child.to_representation(subscription)
+            for subscription in subscriptions
+        ]
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели Subscription.
@@ -202,6 +232,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
     id = serializers.ReadOnlyField(source='author.id')
 
+    author_recipes = None
+
     class Meta:
         """
         Класс Meta определяет метаданные для сериализатора
@@ -219,6 +251,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             "recipes",
             'recipes_count',
         )
+        list_serializer_class = SubscriptionListSerializer
 
     def validate(self, data):
         """
@@ -232,29 +265,36 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         """
         Определяет, подписан ли текущий пользователь на автора рецептов.
         """
-        return Subscription.objects.filter(
-            user=self.context["request"].user,
-            author=obj.author
-        ).exists()
+        user = self.context["request"].user
+        if obj.user_id == user.id:
+            return True
+        return is_subscribed(self.context, obj.author_id)
 
-    def get_recipes(self, obj):
+    def get_recipes_limit(self):
         """
-        Получает список рецептов автора, связанных с объектом Subscription.
+        Возвращает ограничение числа рецептов автора
+        из параметра запроса 'recipes_limit'.
         """
         recipes_limit = (
-            self.context["request"].query_params.get("recipes_limit")
-        )
-        queryset = (
-            obj.author.recipes.all()[:int(recipes_limit)] if recipes_limit
-            else obj.author.recipes.all()
+            self.context["request"].query_params.get("recipes_limit", "")
         )
-        return BriefInfoSerializer(queryset, many=True).data
+        return int(recipes_limit) if recipes_limit.isdigit() else None
+
+    def get_recipes(self, obj):
+        """
+        Получает список последних рецептов автора.
+        """
+        if self.author_recipes is None:
+            return get_author_recipes(
+                [obj.author_id], self.get_recipes_limit()
+            )[obj.author_id]
+        return self.author_recipes[obj.author_id]
 
     def get_recipes_count(self, obj):
         """
         Получает количество рецептов автора.
         """
-        return Recipe.objects.filter(author=obj.author).count()
+        return obj.author.recipes_count
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -274,7 +314,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         queryset=Tag.objects.all(),
         validators=[validate_tags]
     )
-    image = Base64ImageField()
+    image = RawImageField()
 
     class Meta:
         """
@@ -295,48 +335,71 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             "cooking_time",
         )
 
+    def validate_ingredients(self, value):
+        """
+        Проверяет, что список ингредиентов рецепта не пуст.
+        """
+        return validate_ingredients(value)
+
     def validate(self, data):
         """
-        Валидатор ингредиентов в рецепте на анти-повтор.
+        Проверяет ингредиенты рецепта одним запросом:
+        все ли они существуют и нет ли повторов.
+        Сообщает сразу обо всех неверных id.
+        Найденные ингредиенты сохраняет в данных для создания связей.
+        При частичном обновлении без ингредиентов проверка пропускается.
         """
+        if "ingredients" not in data:
+            return data
         ingredients = data["ingredients"]
-        ingredient_list = []
-        for item in ingredients:
-            ingredient = get_object_or_404(
-                Ingredient, id=item["id"]
+        ids = [item["id"] for item in ingredients]
+        found = Ingredient.objects.in_bulk(set(ids))
+        errors = []
+        missing = sorted(set(ids) - found.keys())
+        if missing:
+            errors.append(
+                f"Ингредиенты не найдены: {', '.join(map(str, missing))}."
+            )
+        repeated = [
+            found[pk] for pk, count in Counter(ids).items()
+            if count > 1 and pk in found
+        ]
+        if repeated:
+            errors.append(
+                f"Ингредиенты повторяются в рецепте: "
+                f"{'; '.join(map(str, repeated))}."
             )
-            if ingredient in ingredient_list:
-                raise serializers.ValidationError(
-                    f"Ингредиент - {ingredient} - уже есть в рецепте."
-                )
-            ingredient_list.append(ingredient)
+        if errors:
+            raise serializers.ValidationError({"ingredients": errors})
+        for item in ingredients:
+            item["ingredient"] = found[item["id"]]
         return data
 
     def create_ingredients(self, ingredients, recipe):
         """
-        Создает связанные объекты IngredientRecipe для рецепта.
+        Создает связанные объекты IngredientRecipe для рецепта
+        одним запросом из уже проверенных ингредиентов.
         """
-        ingredient_list = [
+        IngredientRecipe.objects.bulk_create(
             IngredientRecipe(
                 recipe=recipe,
-                ingredient=get_object_or_404(
-                    Ingredient, id=ingredient.get("id")
-                ),
-                amount=ingredient.get("amount")
+                ingredient=item["ingredient"],
+                amount=item["amount"]
             )
-            for ingredient in ingredients
-        ]
-        IngredientRecipe.objects.bulk_create(ingredient_list)
+            for item in ingredients
+        )
 
     @transaction.atomic
     def create(self, validated_data):
         """
         Создает новый рецепт.
+        Изображение сохраняется как есть и обрабатывается в фоне.
         """
         ingredients = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
         recipe = Recipe.objects.create(
             author=self.context["request"].user,
+            image_status=IMAGE_PENDING,
             **validated_data
         )
         recipe.tags.set(tags)
@@ -346,23 +409,44 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def update(self, instance, validated_data):
         """
-        Обновляет существующий рецепт.
-        """
-        instance.tags.clear()
-        tags = validated_data.pop("tags")
-        instance.tags.set(tags)
-        instance.ingredients.clear()
-        ingredients = validated_data.pop("ingredients")
-        self.create_ingredients(ingredients, instance)
-        return super().update(
-            instance,
-            validated_data
-        )
+        Обновляет существующий рецепт, применяя только изменения:
+        теги и ингредиенты сравниваются с текущими,
+        сохраняются только поля, значения которых изменились.
+        Поля, не переданные клиентом, не меняются.
+        Новое изображение сохраняется как есть и обрабатывается в фоне.
+        """
+        tags = validated_data.pop("tags", None)
+        if tags is not None:
+            instance.tags.set(tags)
+        ingredients = validated_data.pop("ingredients", None)
+        if ingredients is not None:
+            sync_recipe_ingredients(
+                instance,
+                [(item["ingredient"], item["amount"]) for item in ingredients],
+            )
+        changed = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        if "image" in changed:
+            instance.image_status = IMAGE_PENDING
+            changed.append("image_status")
+        if changed:
+            instance.save(update_fields=changed + ["updated_at"])
+        return instance
 
     def to_representation(self, instance):
         """
         Преобразует объект модели Recipe в представление для чтения.
+        Рецепт перечитывается со связанными объектами и флагами
+        пользователя, чтобы число запросов не зависело
+        от количества ингредиентов.
         """
+        instance = Recipe.objects.with_related().with_user_flags(
+            self.context["request"].user
+        ).get(pk=instance.pk)
         return RecipeReadSerializer(
             instance, context=self.context
         ).data
@@ -378,6 +462,8 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     author = UserSerializerCustom(read_only=True)
     tags = TagSerializer(read_only=True, many=True)
     image = Base64ImageField()
+    image_srcset = ImageSrcsetField(source="image")
+    image_status = serializers.CharField(read_only=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     ingredients = IngredientInRecipeSerializer(
@@ -402,9 +488,12 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_srcset",
+            "image_status",
             "text",
             "cooking_time",
         )
+        list_serializer_class = RecipeAuthorListSerializer
 
     def get_ingredients(self, obj):
         """
@@ -418,6 +507,8 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         Определяет,
         добавлен ли текущий рецепт в корзину покупок текущего пользователя.
         """
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         request = self.context.get("request")
         if request.user.is_authenticated:
             return obj.carts.filter(user=request.user).exists()
@@ -428,61 +519,43 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         Определяет,
         добавлен ли текущий рецепт в избранное текущего пользователя.
         """
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         request = self.context.get("request")
         if request.user.is_authenticated:
             return obj.favorites.filter(user=request.user).exists()
         return False
 
 
-class ShoppingCartSerializer(serializers.ModelSerializer):
-    """
-    Сериализатор для модели ShoppingCart.
-    """
-
-    class Meta:
-        """
-        Класс Meta определяет метаданные для сериализатора
-        ShoppingCartSerializer.
-        Здесь мы указываем модель с которой работает сериализатор
-        и поля которые будут сериализованы.
-        """
-        model = ShoppingCart
-        fields = "__all__"
-
-    def to_representation(self, instance):
-        """
-        Преобразует объект модели ShoppingCart в представление.
-        Возвращает краткую информацию о рецепте,
-        связанном с объектом ShoppingCart.
-        """
-        return BriefInfoSerializer(
-            instance.recipe,
-            context={"request": self.context.get("request")}
-        ).data
-
-
-class FavoriteSerializer(serializers.ModelSerializer):
+class RecipeIdsBulkSerializer(serializers.Serializer):
     """
-    Сериализатор для модели Favorite.
+    Сериализатор пакетного изменения избранного или списка покупок.
+    Принимает списки id рецептов для добавления и удаления.
     """
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=settings.BULK_RECIPES_MAX_ITEMS,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=settings.BULK_RECIPES_MAX_ITEMS,
+    )
 
-    class Meta:
-        """
-        Класс Meta определяет метаданные для сериализатора
-        FavoriteSerializer.
-        Здесь мы указываем модель с которой работает сериализатор
-        и поля которые будут сериализованы.
-        """
-        model = Favorite
-        fields = "__all__"
-
-    def to_representation(self, instance):
+    def validate(self, data):
         """
-        Преобразует объект модели Favorite в представление.
-        Возвращает краткую информацию о рецепте,
-        связанном с объектом Favorite.
+        Проверяет, что передан хотя бы один id рецепта
+        и что один рецепт не добавляется и не удаляется одновременно.
         """
-        return BriefInfoSerializer(
-            instance.recipe,
-            context={"request": self.context.get("request")}
-        ).data
+        if not data.get("add") and not data.get("remove"):
+            raise serializers.ValidationError(
+                "Необходимо передать id рецептов в 'add' или 'remove'."
+            )
+        both = set(data.get("add", ())) & set(data.get("remove", ()))
+        if both:
+            raise serializers.ValidationError(
+                "Рецепты не могут быть одновременно в 'add' и 'remove': "
+                f"{', '.join(map(str, sorted(both)))}."
+            )
+        return data
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+
+from recipes.models import ShoppingListItem
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+TITLE = "Купить в магазине:"
+FILE_NAME = "list_of_products"
+PDF_FONT = "ShoppingListFont"
+
+
+def get_ingredients(user):
+    """
+    Возвращает выборку ингредиентов из сводного списка покупок пользователя
+    с суммарным количеством каждого ингредиента.
+    """
+    return ShoppingListItem.objects.filter(
+        user=user
+    ).order_by("ingredient__name").values(
+        "ingredient__name",
+        "ingredient__measurement_unit",
+        "amount"
+    )
+
+
+def iterate(ingredients):
+    """
+    Перебирает ингредиенты частями, не загружая всю выборку в память.
+    Запрос выполняется при получении первого элемента.
+    """
+    return ingredients.iterator(chunk_size=settings.SHOPPING_LIST_CHUNK_SIZE)
+
+
+def txt_lines(ingredients):
+    """
+    Генерирует строки списка покупок в текстовом формате.
+    Заголовок отдаётся до выполнения запроса.
+    """
+    yield TITLE
+    for ingredient in iterate(ingredients):
+        yield (
+            f"\n{ingredient['ingredient__name']} "
+            f"({ingredient['ingredient__measurement_unit']}) - "
+            f"{ingredient['amount']}"
+        )
+
+
+class Echo:
+    """
+    Псевдобуфер для csv.writer, возвращающий записанную строку.
+    """
+
+    def write(self, value):
+        """
+        Возвращает переданную строку вместо записи в буфер.
+        """
+        return value
+
+
+def csv_lines(ingredients):
+    """
+    Генерирует строки списка покупок в формате CSV.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(("name", "measurement_unit", "amount"))
+    for ingredient in iterate(ingredients):
+        yield writer.writerow((
+            ingredient["ingredient__name"],
+            ingredient["ingredient__measurement_unit"],
+            ingredient["amount"],
+        ))
+
+
+def json_lines(ingredients):
+    """
+    Генерирует список покупок в формате JSON по одному элементу.
+    """
+    yield "["
+    separator = ""
+    for ingredient in iterate(ingredients):
+        yield separator + json.dumps(
+            {
+                "name": ingredient["ingredient__name"],
+                "measurement_unit": ingredient["ingredient__measurement_unit"],
+                "amount": ingredient["amount"],
+            },
+            ensure_ascii=False,
+        )
+        separator = ","
+    yield "]"
+
+
+def pdf_chunks(ingredients):
+    """
+    Генерирует список покупок в формате PDF частями.
+    Документ PDF собирается целиком в памяти, после чего отдаётся частями,
+    поэтому для больших списков лучше использовать txt, csv или json.
+    Шрифт PDF_FONT регистрируется в get_formats.
+    """
+    font = PDF_FONT
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, initialFontName=font)
+    width, height = A4
+    top = height - 50
+    y = top
+    pdf.setFont(font, 14)
+    pdf.drawString(50, y, TITLE)
+    pdf.setFont(font, 11)
+    for line in txt_lines(ingredients):
+        if line == TITLE:
+            continue
+        y -= 18
+        if y < 50:
+            pdf.showPage()
+            pdf.setFont(font, 11)
+            y = top
+        pdf.drawString(50, y, line.strip())
+    pdf.save()
+    buffer.seek(0)
+    yield from iter(
+        lambda: buffer.read(settings.SHOPPING_LIST_PDF_CHUNK_SIZE), b""
+    )
+
+
+def get_formats():
+    """
+    Возвращает словарь доступных форматов списка покупок:
+    {формат: (тип содержимого, генератор)}.
+    Формат pdf доступен, если установлен reportlab и в
+    SHOPPING_LIST_PDF_FONT задан TTF-шрифт с кириллицей:
+    стандартные шрифты PDF кириллицу не содержат.
+    Шрифт регистрируется здесь один раз при загрузке модуля.
+    """
+    formats = {
+        "txt": ("text/plain; charset=utf-8", txt_lines),
+        "csv": ("text/csv; charset=utf-8", csv_lines),
+        "json": ("application/json", json_lines),
+    }
+    if canvas is not None and settings.SHOPPING_LIST_PDF_FONT:
+        pdfmetrics.registerFont(
+            TTFont(PDF_FONT, settings.SHOPPING_LIST_PDF_FONT)
+        )
+        formats["pdf"] = ("application/pdf", pdf_chunks)
+    return formats
+
+
+FORMATS = get_formats()
@@ -0,0 +1,78 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import bump_versions, reset_catalogue_version
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from users.models import Subscription, User
+
+USER_PUBLIC_FIELDS = {"email", "username", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_changed(sender, action=None, **kwargs):
+    """
+    Сбрасывает кэш ответов о рецептах при изменении рецепта,
+    его тегов или ингредиентов.
+    """
+    if action and action.startswith("pre_"):
+        return
+    bump_versions("recipe")
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    """
+    Сбрасывает кэш ответов о тегах при изменении тега.
+    """
+    bump_versions("tag")
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    """
+    Сбрасывает кэш ответов с рецептами и версию справочника
+    ингредиентов в памяти процесса при изменении ингредиента.
+    Другие процессы отслеживают изменения справочника по базе
+    (api.cache.get_catalogue_version).
+    """
+    bump_versions("ingredient")
+    reset_catalogue_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    """
+    Сбрасывает кэш ответов с данными авторов
+    при изменении публичных полей пользователя.
+    """
+    if update_fields and not USER_PUBLIC_FIELDS & set(update_fields):
+        return
+    bump_versions("user")
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def viewer_changed(sender, instance, **kwargs):
+    """
+    Сбрасывает ETag ответов для пользователя при изменении
+    его избранного, списка покупок или подписок.
+    """
+    bump_versions(f"viewer:{instance.user_id}")
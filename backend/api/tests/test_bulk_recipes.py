@@ -0,0 +1,115 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    ShoppingListItem
+)
+from users.models import User
+
+
+@override_settings(TASKS_ASYNC=False)
+class BulkRecipesTest(TestCase):
+    """
+    Проверяет пакетное изменение избранного и списка покупок.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт читателя, автора и рецепты с ингредиентами.
+        """
+        cls.reader = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Читатель",
+            last_name="Читатель",
+            password="reader-password",
+        )
+        author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Автор",
+            password="author-password",
+        )
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент{number}", measurement_unit="г"
+            )
+            for number in range(3)
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author,
+                name=f"Рецепт{number}",
+                image=f"recipes/image/recipe{number}.jpg",
+                text="Описание",
+                cooking_time=10,
+            )
+            for number in range(30)
+        ]
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=2)
+            for recipe in cls.recipes
+            for ingredient in ingredients
+        )
+
+    def setUp(self):
+        """
+        Создаёт клиента читателя.
+        """
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def bulk(self, url, add=(), remove=()):
+        """
+        Отправляет пакетный запрос и возвращает число запросов к базе.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url, {"add": list(add), "remove": list(remove)},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def test_remove_queries(self):
+        """
+        Удаление выполняется не большим числом запросов, чем добавление,
+        а счётчики и сводный список покупок пересчитываются.
+        """
+        for model, url in (
+            (Favorite, "/api/recipes/favorite/bulk/"),
+            (ShoppingCart, "/api/recipes/shopping_cart/bulk/"),
+        ):
+            with self.subTest(model=model.__name__):
+                ids = [recipe.pk for recipe in self.recipes]
+                added = self.bulk(url, add=ids)
+                self.assertLessEqual(self.bulk(url, remove=ids), added)
+                self.assertFalse(model.objects.filter(user=self.reader))
+                self.assertFalse(
+                    Recipe.objects.exclude(favorites_count=0, carts_count=0)
+                )
+                self.assertFalse(
+                    ShoppingListItem.objects.filter(user=self.reader)
+                )
+
+    def test_add_and_remove_same_recipe(self):
+        """
+        Рецепт нельзя одновременно добавить и удалить.
+        """
+        recipe_id = self.recipes[0].pk
+        response = self.client.post(
+            "/api/recipes/favorite/bulk/",
+            {"add": [recipe_id], "remove": [recipe_id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Favorite.objects.filter(user=self.reader))
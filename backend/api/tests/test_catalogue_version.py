@@ -0,0 +1,142 @@
+import io
+import os
+import tempfile
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.cache import reset_catalogue_version
+from recipes.models import Ingredient
+
+
+@override_settings(INGREDIENT_VERSION_TIMEOUT=0)
+class CatalogueVersionTest(TestCase):
+    """
+    Проверяет, что справочник ингредиентов обновляется
+    после изменений в обход сигналов текущего процесса,
+    например после импорта командой управления в другом процессе.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт ингредиент справочника.
+        """
+        Ingredient.objects.create(name="Соль", measurement_unit="г")
+
+    def setUp(self):
+        """
+        Очищает кэши и создаёт клиента.
+        """
+        for cache in caches.all():
+            cache.clear()
+        reset_catalogue_version()
+        self.client = APIClient()
+
+    def search(self, name):
+        """
+        Возвращает названия ингредиентов, найденных по началу названия.
+        """
+        response = self.client.get("/api/ingredients/", {"name": name})
+        self.assertEqual(response.status_code, 200)
+        return [ingredient["name"] for ingredient in response.json()]
+
+    def import_csv(self, content):
+        """
+        Импортирует ингредиенты из CSV-файла командой управления.
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", encoding="utf-8", delete=False
+        ) as file:
+            file.write(content)
+        try:
+            call_command(
+                "import_ingredients", file.name, stdout=io.StringIO()
+            )
+        finally:
+            os.remove(file.name)
+
+    def test_import(self):
+        """
+        Ингредиенты, добавленные импортом, сразу находятся поиском,
+        а ETag снимка справочника меняется.
+        """
+        self.assertEqual(self.search("сах"), [])
+        etag = self.client.get("/api/ingredients/snapshot/")["ETag"]
+        self.import_csv("Сахар,г\nСахарная пудра,г\n")
+        self.assertEqual(self.search("сах"), ["Сахар", "Сахарная пудра"])
+        self.assertNotEqual(
+            self.client.get("/api/ingredients/snapshot/")["ETag"], etag
+        )
+
+    def test_update_without_signals(self):
+        """
+        Изменения справочника запросом к базе без сигналов
+        перестраивают индекс.
+        """
+        self.assertEqual(self.search("сол"), ["Соль"])
+        Ingredient.objects.bulk_create(
+            [Ingredient(name="Солод", measurement_unit="г")]
+        )
+        self.assertEqual(self.search("сол"), ["Солод", "Соль"])
+        Ingredient.objects.filter(name="Соль").delete()
+        self.assertEqual(self.search("сол"), ["Солод"])
+
+    def test_fields(self):
+        """
+        Список, ингредиент и снимок справочника содержат одни и те же поля.
+        """
+        ingredient = Ingredient.objects.get()
+        expected = {
+            "id": ingredient.id,
+            "name": "Соль",
+            "measurement_unit": "г",
+        }
+        self.assertEqual(
+            self.client.get("/api/ingredients/", {"name": "сол"}).json(),
+            [expected],
+        )
+        self.assertEqual(
+            self.client.get(f"/api/ingredients/{ingredient.id}/").json(),
+            expected,
+        )
+        self.assertEqual(
+            self.client.get("/api/ingredients/snapshot/").json()["results"],
+            [expected],
+        )
+
+
+class IngredientSearchQueriesTest(TestCase):
+    """
+    Проверяет число запросов к базе при поиске ингредиентов
+    по индексу в памяти процесса.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт ингредиенты справочника.
+        """
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"Специя{number}", measurement_unit="г")
+            for number in range(30)
+        )
+
+    def test_autocomplete(self):
+        """
+        Поиск по построенному индексу выполняет один запрос версии
+        справочника, а в пределах INGREDIENT_VERSION_TIMEOUT - ни одного.
+        """
+        client = APIClient()
+        client.get("/api/ingredients/", {"name": "с"})
+        reset_catalogue_version()
+        for expected in (1, 0):
+            with self.subTest(expected=expected):
+                for cache in caches.all():
+                    cache.clear()
+                with self.assertNumQueries(expected):
+                    response = client.get("/api/ingredients/", {"name": "с"})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()), 20)
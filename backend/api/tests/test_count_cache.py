@@ -0,0 +1,124 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import User
+
+
+class RecipeCountCacheTest(TestCase):
+    """
+    Проверяет кэширование количества рецептов в пагинации.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт двух пользователей и три рецепта.
+        """
+        cls.users = [
+            User.objects.create_user(
+                email=f"user{number}@example.com",
+                username=f"user{number}",
+                first_name="User",
+                last_name="User",
+                password="user-password",
+            )
+            for number in range(2)
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.users[0],
+                name=f"recipe{number}",
+                text="text",
+                image=f"recipes/image/recipe{number}.png",
+                cooking_time=5,
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        """
+        Очищает кэши и создаёт клиентов пользователей.
+        """
+        for cache in caches.all():
+            cache.clear()
+        self.clients = []
+        for user in self.users:
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+            )
+            self.clients.append(client)
+
+    def get_list(self, client, **params):
+        """
+        Возвращает данные страницы списка рецептов.
+        """
+        response = client.get("/api/recipes/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_viewer_filters_follow_changes(self):
+        """
+        Количество избранного и корзины меняется сразу после
+        добавления рецепта, в том числе пакетного.
+        """
+        client = self.clients[1]
+        for param, url in (
+            ("is_favorited", "favorite"),
+            ("is_in_shopping_cart", "shopping_cart"),
+        ):
+            with self.subTest(param=param):
+                self.assertEqual(
+                    self.get_list(client, **{param: 1})["count"], 0
+                )
+                response = client.post(
+                    f"/api/recipes/{self.recipes[0].pk}/{url}/"
+                )
+                self.assertEqual(response.status_code, 201)
+                data = self.get_list(client, **{param: 1})
+                self.assertEqual(data["count"], 1)
+                self.assertEqual(len(data["results"]), 1)
+                self.assertEqual(
+                    self.get_list(self.clients[0], **{param: 1})["count"], 0
+                )
+
+    def test_bulk_favorites(self):
+        """
+        Количество избранного меняется после пакетного добавления.
+        """
+        client = self.clients[1]
+        self.assertEqual(self.get_list(client, is_favorited=1)["count"], 0)
+        response = client.post(
+            "/api/recipes/favorite/bulk/",
+            {"add": [recipe.pk for recipe in self.recipes[:2]]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        data = self.get_list(client, is_favorited=1)
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(len(data["results"]), 2)
+
+    def test_unfiltered_count_is_shared(self):
+        """
+        Без фильтров, зависящих от пользователя, количество подсчитывается
+        один раз для всех пользователей и страниц.
+        """
+        self.get_list(self.clients[0])
+        for client, params in (
+            (self.clients[1], {}),
+            (APIClient(), {"page": 2, "limit": 1}),
+        ):
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as context:
+                    self.assertEqual(
+                        self.get_list(client, **params)["count"], 3
+                    )
+                self.assertFalse([
+                    query for query in context.captured_queries
+                    if "COUNT(" in query["sql"]
+                ])
@@ -0,0 +1,79 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import User
+
+
+class RecipeCursorPaginationTest(TestCase):
+    """
+    Проверяет курсорную пагинацию рецептов по позиции (pub_date, id)
+    при совпадающих датах публикации.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт 20 рецептов, у половины из которых одна дата публикации.
+        """
+        author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+            password="author-password",
+        )
+        recipes = [
+            Recipe.objects.create(
+                author=author,
+                name=f"recipe{number}",
+                text="text",
+                image=f"recipes/image/recipe{number}.png",
+                cooking_time=5,
+            )
+            for number in range(20)
+        ]
+        Recipe.objects.filter(
+            pk__in=[recipe.pk for recipe in recipes[5:15]]
+        ).update(pub_date=timezone.now())
+        cls.expected = list(
+            Recipe.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def get_page(self, url, params=None):
+        """
+        Возвращает данные страницы курсорной пагинации.
+        """
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_forward_and_backward(self):
+        """
+        Проход вперёд и назад возвращает все рецепты по одному разу
+        в порядке (-pub_date, -id).
+        """
+        self.client = APIClient()
+        page = self.get_page("/api/recipes/", {"cursor": "", "limit": 3})
+        pages = [[recipe["id"] for recipe in page["results"]]]
+        while page["next"]:
+            page = self.get_page(page["next"])
+            pages.append([recipe["id"] for recipe in page["results"]])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertTrue(all(len(ids) == 3 for ids in pages[:-1]))
+        for ids in reversed(pages[:-1]):
+            page = self.get_page(page["previous"])
+            self.assertEqual([recipe["id"] for recipe in page["results"]], ids)
+        self.assertIsNone(page["previous"])
+
+    def test_invalid_cursor(self):
+        """
+        Курсор с неверной позицией отклоняется с ответом 404.
+        """
+        response = APIClient().get(
+            "/api/recipes/", {"cursor": "cD1ub3QtYS1kYXRl"}
+        )
+        self.assertEqual(response.status_code, 404)
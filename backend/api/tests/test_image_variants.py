@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from api.variants import variant_cache
+
+
+class ImageVariantViewTest(SimpleTestCase):
+    """
+    Проверяет выдачу уменьшенных копий изображений рецептов.
+    """
+    name = "recipes/image/recipe.png"
+    url = f"/api/images/200/{name}"
+
+    def setUp(self):
+        """
+        Сохраняет изображение во временный каталог медиафайлов
+        и направляет кэш копий во временный каталог.
+        """
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache_root = mock.patch.object(
+            variant_cache, "root", os.path.join(self.media_root, "cache")
+        )
+        cache_root.start()
+        self.addCleanup(cache_root.stop)
+        content = BytesIO()
+        Image.new("RGB", (800, 600), "red").save(content, "PNG")
+        default_storage.save(self.name, ContentFile(content.getvalue()))
+
+    def get_width(self, response):
+        """
+        Проверяет успешный ответ и возвращает ширину изображения.
+        """
+        self.assertEqual(response.status_code, 200)
+        with Image.open(BytesIO(b"".join(response.streaming_content))) as im:
+            return im.width
+
+    def test_variant(self):
+        """
+        Копия создаётся при первом запросе и затем отдаётся из кэша.
+        """
+        self.assertEqual(self.get_width(self.client.get(self.url)), 200)
+        self.assertEqual(self.get_width(self.client.get(self.url)), 200)
+
+    def test_evicted_variant(self):
+        """
+        Копия, вытесненная из кэша после проверки, создаётся заново.
+        """
+        missing = os.path.join(self.media_root, "cache", "missing")
+        with mock.patch.object(variant_cache, "get", return_value=missing):
+            self.assertEqual(self.get_width(self.client.get(self.url)), 200)
+
+    def test_unknown_width(self):
+        """
+        Ширина не из RECIPE_IMAGE_VARIANT_SIZES даёт 404.
+        """
+        response = self.client.get(f"/api/images/123/{self.name}")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,153 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+
+
+@skipIf(orjson is None, "orjson не установлен")
+class FastJSONTest(SimpleTestCase):
+    """
+    Проверяет совместимость FastJSONRenderer и FastJSONParser
+    со стандартными JSONRenderer и JSONParser.
+    """
+    payload = {
+        "count": 2,
+        "next": None,
+        "results": [
+            {
+                "id": 1,
+                "name": "Омлет «по-домашнему» 🍳",
+                "text": "Строка\nс переводом, \"кавычками\" и \\ \t",
+                "is_favorited": True,
+                "is_in_shopping_cart": False,
+                "tags": [{"id": 1, "slug": "breakfast", "color": "#E26C2D"}],
+                "ingredients": [
+                    {"id": 1, "amount": 2, "measurement_unit": "шт"},
+                ],
+                "cooking_time": 10,
+                "rating": 4.5,
+            },
+            {
+                "id": 2,
+                "name": "",
+                "tags": [],
+                "ingredients": (),
+                "cooking_time": 0,
+            },
+        ],
+    }
+
+    def assert_same_render(self, data, **kwargs):
+        """
+        Проверяет побайтное совпадение вывода рендереров.
+        """
+        self.assertEqual(
+            FastJSONRenderer().render(data, **kwargs),
+            JSONRenderer().render(data, **kwargs),
+        )
+
+    def test_render_api_payload(self):
+        """
+        Ответ API с вложенными списками, юникодом и экранированием
+        совпадает побайтно.
+        """
+        self.assert_same_render(self.payload)
+
+    def test_render_special_types(self):
+        """
+        Даты, Decimal, UUID, ленивые строки и нестроковые ключи
+        кодируются так же, как кодировщиком DRF.
+        """
+        self.assert_same_render({
+            "datetime": datetime.datetime(2023, 1, 2, 3, 4, 5, 678901),
+            "aware": datetime.datetime(
+                2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+            ),
+            "date": datetime.date(2023, 1, 2),
+            "time": datetime.time(3, 4, 5),
+            "timedelta": datetime.timedelta(hours=1),
+            "decimal": Decimal("1.50"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "lazy": gettext_lazy("Избранное"),
+            1: "целый ключ",
+            "set": frozenset([1]),
+        })
+
+    def test_render_line_separators(self):
+        """
+        Символы U+2028 и U+2029 экранируются.
+        """
+        self.assert_same_render({"text": "a\u2028b\u2029c"})
+
+    def test_render_none(self):
+        """
+        Пустые данные дают пустое тело.
+        """
+        self.assert_same_render(None)
+
+    def test_render_indent_fallback(self):
+        """
+        Форматированный вывод выполняется стандартным рендерером.
+        """
+        self.assert_same_render(
+            self.payload,
+            accepted_media_type="application/json; indent=4",
+        )
+
+    def test_render_big_int_fallback(self):
+        """
+        Целые числа больше 64 бит кодируются стандартным рендерером.
+        """
+        self.assert_same_render({"big": 2 ** 70, "negative": -(2 ** 64)})
+
+    def test_render_unknown_type(self):
+        """
+        Неизвестный тип вызывает ту же ошибку, что и в JSONRenderer.
+        """
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({"object": object()})
+
+    def test_render_float_differences(self):
+        """
+        Документированные отличия: экспоненциальная запись
+        и NaN отличаются от вывода JSONRenderer.
+        """
+        self.assertEqual(
+            FastJSONRenderer().render([1e16, 1e-7]), b"[1e16,1e-7]"
+        )
+        self.assertEqual(
+            JSONRenderer().render([1e16, 1e-7]), b"[1e+16,1e-07]"
+        )
+        self.assertEqual(
+            FastJSONRenderer().render([float("nan")]), b"[null]"
+        )
+        with self.assertRaises(ValueError):
+            JSONRenderer().render([float("nan")])
+
+    def test_parse(self):
+        """
+        Разбор тела совпадает с результатом JSONParser.
+        """
+        content = JSONRenderer().render(self.payload)
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(content)),
+            JSONParser().parse(io.BytesIO(content)),
+        )
+
+    def test_parse_error(self):
+        """
+        Некорректный JSON вызывает ParseError.
+        """
+        for parser in (FastJSONParser(), JSONParser()):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(b'{"name": '))
@@ -0,0 +1,156 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.cards import merge_card
+from api.readers import (
+    UserReadSerializer,
+    build_recipe_cards,
+    get_author_recipes
+)
+from api.serializers import (
+    BriefInfoSerializer,
+    RecipeReadSerializer,
+    UserSerializerCustom
+)
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from users.models import Subscription, User
+
+
+class ReadSerializersParityTest(TestCase):
+    """
+    Проверяет, что облегчённые пути чтения возвращают то же
+    представление, что и сериализаторы DRF.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт пользователей, подписки, рецепты с тегами и ингредиентами,
+        избранное и список покупок.
+        """
+        cls.users = [
+            User.objects.create_user(
+                email=f"user{number}@example.com",
+                username=f"user{number}",
+                first_name="Имя",
+                last_name=f"Фамилия{number}",
+                password="user-password",
+            )
+            for number in range(3)
+        ]
+        viewer = cls.users[0]
+        Subscription.objects.create(user=viewer, author=cls.users[1])
+        tags = [
+            Tag.objects.create(
+                name=f"Тег{number}", color=f"#00000{number}",
+                slug=f"tag{number}"
+            )
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент{number}", measurement_unit="г"
+            )
+            for number in range(5)
+        ]
+        for number in range(6):
+            recipe = Recipe.objects.create(
+                author=cls.users[number % 3],
+                name=f"Рецепт «{number}»",
+                text="Описание\nв две строки",
+                image=f"recipes/image/recipe{number}.png",
+                cooking_time=number + 1,
+            )
+            recipe.tags.set(tags[number % 3:])
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+                for amount, ingredient in enumerate(
+                    ingredients[:number], start=1
+                )
+            )
+            if number % 2:
+                Favorite.objects.create(user=viewer, recipe=recipe)
+            if number % 3:
+                ShoppingCart.objects.create(user=viewer, recipe=recipe)
+
+    def get_request(self, user):
+        """
+        Возвращает запрос пользователя для контекста сериализаторов.
+        """
+        request = Request(APIRequestFactory().get("/api/"))
+        request.user = user
+        return request
+
+    def assert_same_json(self, expected, actual):
+        """
+        Проверяет, что представления совпадают вместе с порядком ключей.
+        """
+        self.assertEqual(
+            json.dumps(expected, ensure_ascii=False),
+            json.dumps(actual, ensure_ascii=False),
+        )
+
+    def test_recipes(self):
+        """
+        Карточки рецептов совпадают с RecipeReadSerializer.
+        """
+        for user in (AnonymousUser(), self.users[0]):
+            with self.subTest(user=user):
+                request = self.get_request(user)
+                recipes = list(
+                    Recipe.objects.with_related().with_user_flags(user)
+                )
+                expected = RecipeReadSerializer(
+                    recipes, many=True, context={"request": request}
+                ).data
+                cards = build_recipe_cards([recipe.pk for recipe in recipes])
+                actual = [
+                    merge_card(cards[recipe.pk], recipe, request)
+                    for recipe in recipes
+                ]
+                self.assert_same_json(expected, actual)
+
+    def test_users(self):
+        """
+        UserReadSerializer совпадает с UserSerializerCustom.
+        """
+        users = list(User.objects.order_by("id"))
+        for user in (AnonymousUser(), self.users[0]):
+            with self.subTest(user=user):
+                context = {"request": self.get_request(user)}
+                self.assert_same_json(
+                    UserSerializerCustom(
+                        users, many=True, context=context
+                    ).data,
+                    UserReadSerializer(users, many=True, context=context).data,
+                )
+
+    def test_author_recipes(self):
+        """
+        Рецепты авторов для подписок совпадают с BriefInfoSerializer.
+        """
+        author_ids = [user.id for user in self.users]
+        for limit in (None, 1):
+            with self.subTest(limit=limit):
+                actual = get_author_recipes(author_ids, limit)
+                for author_id in author_ids:
+                    recipes = Recipe.objects.filter(
+                        author_id=author_id
+                    ).order_by("-pub_date", "-id")[:limit]
+                    self.assert_same_json(
+                        BriefInfoSerializer(recipes, many=True).data,
+                        actual[author_id],
+                    )
@@ -0,0 +1,108 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag
+)
+from users.models import User
+
+
+@override_settings(TASKS_ASYNC=False)
+class RecipeIngredientsUpdateTest(TestCase):
+    """
+    Проверяет обновление ингредиентов рецепта по разнице
+    с текущим составом.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт автора, ингредиенты и рецепт в списке покупок автора.
+        """
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Автор",
+            password="author-password",
+        )
+        cls.tag = Tag.objects.create(
+            name="Завтрак", color="#E26C2D", slug="breakfast"
+        )
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент{number}", measurement_unit="г"
+            )
+            for number in range(4)
+        ]
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name="Рецепт",
+            image="recipes/images/recipe.jpg",
+            text="Описание",
+            cooking_time=10,
+        )
+        cls.recipe.tags.set([cls.tag])
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=cls.recipe, ingredient=ingredient, amount=amount
+            )
+            for amount, ingredient in enumerate(cls.ingredients[:3], start=1)
+        )
+        ShoppingCart.objects.create(user=cls.author, recipe=cls.recipe)
+
+    def setUp(self):
+        """
+        Создаёт клиента автора.
+        """
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def update(self, amounts):
+        """
+        Обновляет ингредиенты рецепта словарём {ингредиент: количество}.
+        """
+        response = self.client.patch(
+            f"/api/recipes/{self.recipe.pk}/",
+            {
+                "ingredients": [
+                    {"id": ingredient.pk, "amount": amount}
+                    for ingredient, amount in amounts.items()
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_update(self):
+        """
+        Удаление, изменение и добавление ингредиентов
+        отражаются в рецепте, дате изменения и списке покупок.
+        """
+        first, second, third, fourth = self.ingredients
+        updated_at = Recipe.objects.get(pk=self.recipe.pk).updated_at
+        self.update({first: 1, second: 5, fourth: 7})
+        self.assertEqual(
+            dict(
+                IngredientRecipe.objects.filter(
+                    recipe=self.recipe
+                ).values_list("ingredient_id", "amount")
+            ),
+            {first.pk: 1, second.pk: 5, fourth.pk: 7},
+        )
+        self.assertEqual(
+            dict(
+                ShoppingListItem.objects.filter(
+                    user=self.author, amount__gt=0
+                ).values_list("ingredient_id", "amount")
+            ),
+            {first.pk: 1, second.pk: 5, fourth.pk: 7},
+        )
+        self.assertGreater(
+            Recipe.objects.get(pk=self.recipe.pk).updated_at, updated_at
+        )
@@ -0,0 +1,96 @@
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+from users.models import Subscription, User
+
+
+class RecipeListQueriesTest(TestCase):
+    """
+    Проверяет, что список рецептов загружается постоянным
+    числом запросов независимо от размера страницы.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Создаёт авторов, теги, ингредиенты и 60 рецептов.
+        """
+        cls.user = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Reader",
+            last_name="Reader",
+            password="reader-password",
+        )
+        authors = [
+            User.objects.create_user(
+                email=f"author{number}@example.com",
+                username=f"author{number}",
+                first_name="Author",
+                last_name="Author",
+                password="author-password",
+            )
+            for number in range(3)
+        ]
+        Subscription.objects.create(user=cls.user, author=authors[0])
+        tags = [
+            Tag.objects.create(
+                name=f"tag{number}", color=f"#00000{number}",
+                slug=f"tag{number}"
+            )
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"ingredient{number}", measurement_unit="g"
+            )
+            for number in range(10)
+        ]
+        for number in range(60):
+            recipe = Recipe.objects.create(
+                author=authors[number % len(authors)],
+                name=f"recipe{number}",
+                text="text",
+                image=f"recipes/image/recipe{number}.png",
+                cooking_time=5,
+            )
+            recipe.tags.set(tags[:number % len(tags) + 1])
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1
+                )
+                for ingredient in ingredients[:number % 5 + 1]
+            )
+
+    def assert_page_queries(self, client, expected):
+        """
+        Запрашивает страницы рецептов разного размера с пустыми кэшами
+        и проверяет, что число запросов к базе одинаково и равно 'expected'.
+        """
+        for limit in (5, 50):
+            for cache in caches.all():
+                cache.clear()
+            with self.subTest(limit=limit), self.assertNumQueries(expected):
+                response = client.get("/api/recipes/", {"limit": limit})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), limit)
+
+    def test_anonymous(self):
+        """
+        Число запросов анонимного пользователя не зависит от размера страницы.
+        """
+        self.assert_page_queries(APIClient(), 6)
+
+    def test_authenticated(self):
+        """
+        Число запросов пользователя не зависит от размера страницы.
+        Один запрос добавляет проверка токена.
+        """
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user)}"
+        )
+        self.assert_page_queries(client, 7)
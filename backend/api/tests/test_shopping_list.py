@@ -0,0 +1,40 @@
+import os
+from unittest import skipIf
+
+from django.test import SimpleTestCase, override_settings
+
+from api import shopping_list
+from recipes.models import ShoppingListItem
+
+DEJAVU_SANS = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+class ShoppingListFormatsTest(SimpleTestCase):
+    """
+    Проверяет набор форматов списка покупок.
+    """
+
+    @override_settings(SHOPPING_LIST_PDF_FONT="")
+    def test_pdf_without_font(self):
+        """
+        Без шрифта с кириллицей формат pdf недоступен.
+        """
+        self.assertEqual(
+            list(shopping_list.get_formats()), ["txt", "csv", "json"]
+        )
+
+    @skipIf(shopping_list.canvas is None, "reportlab не установлен")
+    @skipIf(not os.path.exists(DEJAVU_SANS), "нет шрифта DejaVu Sans")
+    @override_settings(SHOPPING_LIST_PDF_FONT=DEJAVU_SANS)
+    def test_pdf_with_font(self):
+        """
+        С заданным шрифтом формат pdf доступен и документ
+        использует этот шрифт.
+        """
+        formats = shopping_list.get_formats()
+        content_type, generator = formats["pdf"]
+        self.assertEqual(content_type, "application/pdf")
+        content = b"".join(generator(ShoppingListItem.objects.none()))
+        self.assertTrue(content.startswith(b"%PDF"))
+        self.assertIn(b"DejaVuSans", content)
+        self.assertNotIn(b"Helvetica", content)
@@ -0,0 +1,131 @@
+import threading
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+THREADS = 8
+
+
+@override_settings(TASKS_ASYNC=False)
+class ConcurrentUpsertsTest(TransactionTestCase):
+    """
+    Проверяет, что одновременные запросы на добавление одного рецепта
+    в избранное или список покупок и на одну подписку создают
+    ровно одну запись.
+    """
+
+    def setUp(self):
+        """
+        Создаёт читателя, автора и его рецепт.
+        """
+        self.reader = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Читатель",
+            last_name="Читатель",
+            password="reader-password",
+        )
+        self.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Автор",
+            password="author-password",
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            name="Рецепт",
+            image="recipes/images/recipe.jpg",
+            text="Описание",
+            cooking_time=10,
+        )
+
+    def post_concurrently(self, url):
+        """
+        Отправляет один и тот же POST-запрос от читателя
+        из THREADS потоков одновременно.
+        Возвращает отсортированный список кодов ответов.
+        """
+        barrier = threading.Barrier(THREADS)
+        statuses = []
+        errors = []
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(self.reader)
+            try:
+                barrier.wait()
+                statuses.append(client.post(url).status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return sorted(statuses)
+
+    def assert_single_created(self, statuses):
+        """
+        Проверяет, что создан ровно один объект, а остальные
+        запросы получили ошибку 400.
+        """
+        self.assertEqual(statuses, [201] + [400] * (THREADS - 1))
+
+    def test_favorite(self):
+        """
+        Рецепт добавляется в избранное один раз.
+        """
+        self.assert_single_created(
+            self.post_concurrently(f"/api/recipes/{self.recipe.pk}/favorite/")
+        )
+        self.assertEqual(
+            Favorite.objects.filter(
+                user=self.reader, recipe=self.recipe
+            ).count(),
+            1,
+        )
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+
+    def test_shopping_cart(self):
+        """
+        Рецепт добавляется в список покупок один раз.
+        """
+        self.assert_single_created(
+            self.post_concurrently(
+                f"/api/recipes/{self.recipe.pk}/shopping_cart/"
+            )
+        )
+        self.assertEqual(
+            ShoppingCart.objects.filter(
+                user=self.reader, recipe=self.recipe
+            ).count(),
+            1,
+        )
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.carts_count, 1)
+
+    def test_subscribe(self):
+        """
+        Подписка на автора создаётся один раз.
+        """
+        self.assert_single_created(
+            self.post_concurrently(f"/api/users/{self.author.pk}/subscribe/")
+        )
+        self.assertEqual(
+            Subscription.objects.filter(
+                user=self.reader, author=self.author
+            ).count(),
+            1,
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.subscribers_count, 1)
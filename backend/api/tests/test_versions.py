@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from api.cache import bump_versions, get_versions
+
+
+class VersionsTest(SimpleTestCase):
+    """
+    Проверяет счётчики версий, по которым сбрасываются кэши API.
+    """
+
+    def test_bump(self):
+        """
+        Увеличение счётчика меняет версию только для своего имени.
+        """
+        tag, user = get_versions("tag", "user")
+        bump_versions("tag")
+        self.assertEqual(get_versions("tag", "user"), (tag + 1, user))
+
+    def test_cleared_counter(self):
+        """
+        После очистки кэша счётчик не возвращается к прежним значениям.
+        """
+        before = get_versions("tag")
+        caches[settings.API_VERSIONS_CACHE_ALIAS].clear()
+        self.assertGreater(get_versions("tag"), before)
+
+    def test_bump_from_other_process(self):
+        """
+        Счётчик, увеличенный в другом процессе (например, командой
+        управления), виден в текущем.
+        """
+        before = get_versions("tag")
+        subprocess.run(
+            [
+                sys.executable, "manage.py", "shell", "-c",
+                "from api.cache import bump_versions; bump_versions('tag')",
+            ],
+            cwd=settings.BASE_DIR,
+            check=True,
+            capture_output=True,
+        )
+        self.assertNotEqual(get_versions("tag"), before)
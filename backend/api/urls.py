@@ -2,6 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (
+    CacheStatsView,
+    ImageVariantView,
     UserViewSetCustom,
     IngredientViewSet,
     RecipeViewSet,
@@ -37,6 +39,12 @@ router_v1.register(
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path(
+        'images/<int:width>/<path:name>',
+        ImageVariantView.as_view(),
+        name='image-variant'
+    ),
     path('', include(router_v1.urls)),
     path('', include('djoser.urls')),
 ]
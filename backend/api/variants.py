@@ -0,0 +1,163 @@
+import hashlib
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from recipes import images
+
+IMAGE_PREFIX = "recipes/image/"
+
+
+class DiskLRUCache:
+    """
+    Ограниченный по размеру кэш файлов на диске.
+    Время последнего обращения хранится во времени изменения файла,
+    при превышении 'max_size' удаляются давно не запрашивавшиеся файлы,
+    пока кэш не уменьшится до 'low_water' от предела.
+    Размер кэша отслеживается в памяти процесса и пересчитывается
+    по каталогу при каждой очистке, поэтому каталог можно делить
+    между несколькими процессами.
+    """
+
+    def __init__(self, root, max_size, low_water=0.9):
+        self.root = root
+        self.max_size = max_size
+        self.low_water = low_water
+        self.lock = threading.Lock()
+        self.size = None
+
+    def path(self, key):
+        """
+        Возвращает путь к файлу кэша для ключа.
+        """
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, key):
+        """
+        Возвращает путь к файлу из кэша или None
+        и отмечает обращение к нему.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def set(self, key, content):
+        """
+        Атомарно сохраняет содержимое в кэш и возвращает путь к файлу.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+        with self.lock:
+            if self.size is None:
+                self.size = self.scan()[1]
+            else:
+                self.size += len(content)
+            if self.size > self.max_size:
+                self.evict()
+        return path
+
+    def scan(self):
+        """
+        Возвращает файлы кэша (время обращения, размер, путь)
+        и их общий размер.
+        """
+        entries = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self):
+        """
+        Удаляет давно не запрашивавшиеся файлы,
+        пока размер кэша не станет меньше 'low_water' от предела.
+        """
+        entries, self.size = self.scan()
+        limit = self.max_size * self.low_water
+        for _, size, path in sorted(entries):
+            if self.size <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+
+variant_cache = DiskLRUCache(
+    settings.RECIPE_IMAGE_VARIANTS_ROOT,
+    settings.RECIPE_IMAGE_VARIANTS_MAX_SIZE,
+)
+
+
+def is_image_name(name):
+    """
+    Проверяет, что имя указывает на изображение рецепта в хранилище
+    и не выходит за пределы каталога изображений.
+    """
+    return (
+        name.startswith(IMAGE_PREFIX)
+        and os.path.normpath(name) == name
+        and default_storage.exists(name)
+    )
+
+
+def open_variant(name, width):
+    """
+    Возвращает открытый файл уменьшенной до ширины 'width' копии
+    изображения рецепта и её формат, создавая копию при первом запросе.
+    Копии хранятся в дисковом кэше variant_cache по имени файла,
+    а имя файла меняется при каждой замене изображения,
+    поэтому устаревшие копии не отдаются и вытесняются из кэша.
+    Файл открывается сразу при обращении к кэшу: если другой процесс
+    успел его вытеснить, копия создаётся заново и отдаётся из памяти.
+    """
+    image_format = images.get_format()
+    key = f"{width}:{image_format}:{name}"
+    path = variant_cache.get(key)
+    if path is not None:
+        try:
+            return open(path, "rb"), image_format
+        except FileNotFoundError:
+            pass
+    with default_storage.open(name, "rb") as file:
+        content, _ = images.encode(file, width)
+    variant_cache.set(key, content)
+    return BytesIO(content), image_format
+
+
+def get_srcset(name, request=None):
+    """
+    Возвращает значение атрибута srcset с уменьшенными копиями
+    изображения для всех размеров RECIPE_IMAGE_VARIANT_SIZES.
+    Если передан запрос, ссылки абсолютные, как у поля 'image'.
+    """
+    if not name:
+        return None
+    urls = []
+    for width in settings.RECIPE_IMAGE_VARIANT_SIZES:
+        url = reverse(
+            "api:image-variant", kwargs={"width": width, "name": name}
+        )
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        urls.append(f"{url} {width}w")
+    return ", ".join(urls)
@@ -1,38 +1,78 @@
-from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
-from django.db.models import Sum
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.db.models import Max
 from djoser.views import UserViewSet
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.views import APIView
 from rest_framework import viewsets, status
 
-from api.filters import SearchIngredientFilter, RecipeFilter
-from api.pagination import CustomPaginLimitOnPage
+from api import shopping_list
+from api.cache import bump_versions, get_stats
+from api.cards import RecipeCardReadSerializer
+from api.filters import IngredientIndexFilter, RecipeFilter
+from api.mixins import AnonymousCacheMixin, ConditionalGetMixin
+from api.readers import UserReadSerializer
+from api.search import ingredient_index
+from api.variants import is_image_name, open_variant
+from api.pagination import COUNT_CACHED, COUNT_EXACT, CustomPaginLimitOnPage
 from users.models import Subscription, User
 from api.permissions import (
     AuthorOrReadOnly,
     AdminOrReadOnly
 )
 from api.serializers import (
-    ShoppingCartSerializer,
+    RecipeIdsBulkSerializer,
     SubscriptionSerializer,
     RecipeCreateSerializer,
     UserSerializerCustom,
     IngredientSerializer,
-    RecipeReadSerializer,
-    FavoriteSerializer,
+    BriefInfoSerializer,
     TagSerializer
 )
+from recipes.feeds import get_feed
+from recipes.images import DECODE_ERRORS
 from recipes.models import (
-    IngredientRecipe,
     ShoppingCart,
     Ingredient,
     Favorite,
     Recipe,
     Tag
 )
+from recipes.services import (
+    ALREADY_ADDED,
+    NOT_FOUND,
+    REMOVED,
+    add_user_recipe,
+    bulk_update_user_recipes,
+    remove_user_recipe,
+    subscribe,
+    unsubscribe
+)
+
+
+def get_object_id(value):
+    """
+    Преобразует id объекта из адреса запроса в число.
+    Для некорректного id возвращает ответ 404.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise NotFound
+
+
+def error_response(message):
+    """
+    Возвращает ответ 400 с описанием ошибки.
+    """
+    return Response(
+        {"errors": message}, status=status.HTTP_400_BAD_REQUEST
+    )
 
 
 class UserViewSetCustom(UserViewSet):
@@ -45,8 +85,20 @@ class UserViewSetCustom(UserViewSet):
     serializer_class = UserSerializerCustom
     permission_classes = (IsAuthenticated,)
     pagination_class = CustomPaginLimitOnPage
+    cursor_ordering = ("-id",)
     lookup_field = 'id'
 
+    def get_serializer_class(self):
+        """
+        Возвращает облегчённый сериализатор для чтения пользователей,
+        для остальных действий - сериализатор djoser.
+        """
+        if self.request.method == "GET" and self.action in (
+            "list", "retrieve", "me"
+        ):
+            return UserReadSerializer
+        return super().get_serializer_class()
+
     @action(detail=True, methods=("POST", "DELETE",))
     def subscribe(self, request, id=None):
         """
@@ -54,19 +106,29 @@ class UserViewSetCustom(UserViewSet):
         на указанного автора.
         """
         user = request.user
-        author = get_object_or_404(User, id=id)
+        author_id = get_object_id(id)
         if request.method == "POST":
-            subscribe = Subscription.objects.create(user=user, author=author)
+            if author_id == user.id:
+                return error_response(
+                    "Вы не можете подписаться на самого себя."
+                )
+            result = subscribe(user, author_id)
+            if result == NOT_FOUND:
+                raise NotFound
+            if result == ALREADY_ADDED:
+                return error_response("Вы уже подписаны на этого автора.")
             serializer = SubscriptionSerializer(
-                subscribe, context={"request": request}
+                Subscription.objects.select_related("author").get(
+                    pk=result.pk
+                ),
+                context={"request": request}
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        subscription = get_object_or_404(
-            Subscription,
-            user=user,
-            author=author
-        )
-        subscription.delete()
+        result = unsubscribe(user, author_id)
+        if result == NOT_FOUND:
+            raise NotFound
+        if result != REMOVED:
+            return error_response("Вы не подписаны на этого автора.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=("GET",))
@@ -75,7 +137,9 @@ class UserViewSetCustom(UserViewSet):
         Получает список подписок текущего пользователя.
         """
         user = request.user
-        queryset = Subscription.objects.filter(user=user)
+        queryset = Subscription.objects.filter(
+            user=user
+        ).select_related("author")
         pages = self.paginate_queryset(queryset)
         serializer = SubscriptionSerializer(
             pages,
@@ -85,7 +149,11 @@ class UserViewSetCustom(UserViewSet):
         return self.get_paginated_response(serializer.data)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin,
+    AnonymousCacheMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet для модели Recipe.
     Включает дополнительные действия для работы с рецептами:
@@ -95,111 +163,220 @@ class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     serializer_class = RecipeCreateSerializer
     pagination_class = CustomPaginLimitOnPage
+    cursor_ordering = ("-pub_date", "-id")
+    cache_versions = ("recipe", "tag", "ingredient", "user")
+    viewer_filter_params = ("is_favorited", "is_in_shopping_cart")
     permission_classes = (AuthorOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
+    @property
+    def pagination_count_mode(self):
+        """
+        Возвращает способ подсчёта количества рецептов для пагинации:
+        для ленты подписок - точный, так как она заполняется в фоне
+        без изменения версий кэша, для остальных списков - кэшируемый.
+        """
+        return COUNT_EXACT if self.action == "feed" else COUNT_CACHED
+
+    def get_queryset(self):
+        """
+        Возвращает выборку рецептов.
+        Для ленты подписок - рецепты из ленты текущего пользователя.
+        Для чтения добавляет флаги текущего пользователя,
+        остальные данные берутся из карточек рецептов.
+        """
+        if self.action == "feed":
+            queryset = get_feed(self.request.user).order_by(
+                *self.cursor_ordering
+            )
+        else:
+            queryset = super().get_queryset()
+        if self.request.method == "GET":
+            return queryset.with_user_flags(self.request.user)
+        return queryset
+
+    def get_etag_validators(self, request):
+        """
+        Дополняет данные для ETag датой последнего изменения рецепта
+        (для списка - максимальной по всем рецептам).
+        """
+        validators = super().get_etag_validators(request)
+        recipes = Recipe.objects.all()
+        if self.action == "retrieve":
+            pk = str(self.kwargs.get("pk"))
+            recipes = recipes.filter(pk=pk) if pk.isdigit() else (
+                recipes.none()
+            )
+        validators.append(recipes.aggregate(Max("updated_at")))
+        return validators
+
     def get_serializer_class(self):
         """
         Возвращает соответствующий класс сериализатора
         в зависимости от типа запроса.
         """
         if self.request.method == "GET":
-            return RecipeReadSerializer
+            return RecipeCardReadSerializer
         return RecipeCreateSerializer
 
-    def create_list_of_products(self, ingredients):
+    @action(
+        detail=False,
+        methods=("GET",),
+        permission_classes=(IsAuthenticated,)
+    )
+    def feed(self, request):
         """
-        Создает список продуктов на основе переданных ингредиентов.
+        Возвращает ленту рецептов авторов,
+        на которых подписан текущий пользователь (сначала новые).
         """
-        list_of_products = ["Купить в магазине:"]
-        for ingredient in ingredients:
-            ingredient_name = ingredient.get("ingredient__name", "")
-            measurement_unit = ingredient.get(
-                "ingredient__measurement_unit", ""
-            )
-            amount = ingredient.get("amount", "")
-            list_of_products.append(
-                f"{ingredient_name} ({measurement_unit}) - {amount}"
-            )
-        return "\n".join(list_of_products)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-    @action(detail=False, methods=("GET",))
+    @action(
+        detail=False,
+        methods=("GET",),
+        permission_classes=(IsAuthenticated,)
+    )
     def download_shopping_cart(self, request):
         """
-        Экспортирует список покупок пользователя
-        в текстовый файл для скачивания.
-        """
-        ingredients = IngredientRecipe.objects.filter(
-            recipe__carts__user=request.user
-        ).order_by("ingredient__name").values(
-            "ingredient__name",
-            "ingredient__measurement_unit"
-        ).annotate(amount=Sum('amount'))
-        carts_content = self.create_list_of_products(ingredients)
-        file_name = "list_of_products.txt"
-        response = HttpResponse(
-            carts_content,
-            content_type='text/plain'
+        Экспортирует список покупок пользователя в файл для скачивания.
+        Формат задаётся параметром 'file_format': txt (по умолчанию),
+        csv, json или pdf (если установлен reportlab и задан
+        шрифт SHOPPING_LIST_PDF_FONT).
+        Файл отдаётся потоком по мере чтения выборки.
+        """
+        file_format = request.query_params.get("file_format", "txt")
+        if file_format not in shopping_list.FORMATS:
+            raise ValidationError({
+                "file_format": (
+                    f"Доступные форматы: "
+                    f"{', '.join(shopping_list.FORMATS)}."
+                )
+            })
+        content_type, generator = shopping_list.FORMATS[file_format]
+        ingredients = shopping_list.get_ingredients(request.user)
+        response = StreamingHttpResponse(
+            generator(ingredients),
+            content_type=content_type
         )
+        file_name = f"{shopping_list.FILE_NAME}.{file_format}"
         response["Content-Disposition"] = f'attachment; filename="{file_name}"'
         return response
 
+    def add_recipe(self, request, pk, model, message):
+        """
+        Добавляет рецепт в избранное или список покупок
+        текущего пользователя одним запросом к базе.
+        """
+        recipe_id = get_object_id(pk)
+        result = add_user_recipe(model, request.user, recipe_id)
+        if result == NOT_FOUND:
+            raise NotFound
+        if result == ALREADY_ADDED:
+            return error_response(message)
+        serializer = BriefInfoSerializer(
+            Recipe.objects.get(pk=recipe_id),
+            context={"request": request}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def remove_recipe(self, request, pk, model, message):
+        """
+        Удаляет рецепт из избранного или списка покупок
+        текущего пользователя.
+        """
+        result = remove_user_recipe(model, request.user, get_object_id(pk))
+        if result == NOT_FOUND:
+            raise NotFound
+        if result != REMOVED:
+            return error_response(message)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @action(detail=True, methods=("POST",))
     def shopping_cart(self, request, pk):
         """
         Добавляет рецепт в список покупок текущего пользователя.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        data = {"recipe": recipe.id, "user": request.user.id}
-        serializer = ShoppingCartSerializer(
-            data=data,
-            context={"request": request}
+        return self.add_recipe(
+            request, pk, ShoppingCart, "Рецепт уже в списке покупок."
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @shopping_cart.mapping.delete
     def destroy_shopping_cart(self, request, pk):
         """
         Удаляет рецепт из списка покупок текущего пользователя.
         """
-        get_object_or_404(
-            ShoppingCart,
-            recipe__id=pk,
-            user=request.user
-        ).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return self.remove_recipe(
+            request, pk, ShoppingCart, "Рецепта нет в списке покупок."
+        )
+
+    def bulk_update(self, request, model):
+        """
+        Пакетно добавляет и удаляет рецепты в избранном
+        или списке покупок текущего пользователя.
+        """
+        serializer = RecipeIdsBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_update_user_recipes(
+            model,
+            request.user,
+            serializer.validated_data.get("add", ()),
+            serializer.validated_data.get("remove", ()),
+        )
+        bump_versions(f"viewer:{request.user.id}")
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=("POST",),
+        url_path="shopping_cart/bulk",
+        permission_classes=(IsAuthenticated,)
+    )
+    def shopping_cart_bulk(self, request):
+        """
+        Пакетно изменяет список покупок текущего пользователя.
+        """
+        return self.bulk_update(request, ShoppingCart)
+
+    @action(
+        detail=False,
+        methods=("POST",),
+        url_path="favorite/bulk",
+        permission_classes=(IsAuthenticated,)
+    )
+    def favorite_bulk(self, request):
+        """
+        Пакетно изменяет избранное текущего пользователя.
+        """
+        return self.bulk_update(request, Favorite)
 
     @action(detail=True, methods=("POST",))
     def favorite(self, request, pk):
         """
         Добавляет рецепт в избранное текущего пользователя.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        data = {"recipe": recipe.id, "user": request.user.id}
-        serializer = FavoriteSerializer(
-            data=data, context={"request": request}
+        return self.add_recipe(
+            request, pk, Favorite, "Рецепт уже в избранном."
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @favorite.mapping.delete
     def destroy_favorite(self, request, pk):
         """
         Удаляет рецепт из избранного текущего пользователя.
         """
-        get_object_or_404(
-            Favorite,
-            recipe=get_object_or_404(Recipe, id=pk),
-            user=request.user
-        ).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return self.remove_recipe(
+            request, pk, Favorite, "Рецепта нет в избранном."
+        )
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(
+    ConditionalGetMixin,
+    AnonymousCacheMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet для модели Tag.
     Включает стандартные CRUD-операции.
@@ -209,18 +386,106 @@ class TagViewSet(viewsets.ModelViewSet):
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
     permission_classes = (AdminOrReadOnly,)
+    cache_versions = ("tag",)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(
+    ConditionalGetMixin,
+    AnonymousCacheMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet для модели Ingredient.
     Включает стандартные CRUD-операции.
     Доступ только для администраторов
     или только чтение.
-    Поддерживает фильтрацию по имени ингредиента.
+    Поддерживает поиск по имени ингредиента
+    по индексу справочника в памяти процесса
+    и выдачу снимка всего справочника.
     """
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     permission_classes = (AdminOrReadOnly,)
-    filter_backends = (SearchIngredientFilter,)
-    search_fields = ("^name",)
+    filter_backends = (IngredientIndexFilter,)
+    cache_versions = ("catalogue",)
+    user_independent = True
+    cache_max_age = settings.INGREDIENT_CACHE_MAX_AGE
+
+    @action(detail=False, methods=("GET",))
+    def snapshot(self, request):
+        """
+        Возвращает весь справочник ингредиентов и его версию,
+        чтобы клиент мог загрузить его один раз и искать локально.
+        Ответ на запрос с актуальной версией в параметре 'version'
+        не меняется и кэшируется клиентом надолго.
+        """
+        return self.conditional_response(request, self.get_snapshot)
+
+    def get_snapshot(self, request):
+        """
+        Формирует ответ со снимком справочника ингредиентов.
+        """
+        version, ingredients = ingredient_index.get_snapshot()
+        response = Response({
+            "version": version,
+            "count": len(ingredients),
+            "results": ingredients,
+        })
+        if request.query_params.get("version") == version:
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.INGREDIENT_SNAPSHOT_MAX_AGE,
+                immutable=True,
+            )
+        return response
+
+
+class CacheStatsView(APIView):
+    """
+    Представление статистики кэша ответов API.
+    Доступ только для администраторов.
+    """
+    permission_classes = (IsAdminUser,)
+    cached_views = ("recipe", "tag", "ingredient")
+
+    def get(self, request):
+        """
+        Возвращает количество попаданий и промахов кэша по представлениям.
+        """
+        return Response(get_stats(self.cached_views))
+
+
+class ImageVariantView(APIView):
+    """
+    Представление уменьшенных копий изображений рецептов.
+    Ширина копии выбирается из RECIPE_IMAGE_VARIANT_SIZES,
+    копии создаются при первом запросе и хранятся в дисковом кэше.
+    """
+    authentication_classes = ()
+
+    def get(self, request, width, name):
+        """
+        Возвращает копию изображения 'name' шириной не больше 'width'.
+        Имя файла меняется при замене изображения,
+        поэтому ответ кэшируется клиентом надолго.
+        """
+        if (
+            width not in settings.RECIPE_IMAGE_VARIANT_SIZES
+            or not is_image_name(name)
+        ):
+            raise NotFound()
+        try:
+            file, image_format = open_variant(name, width)
+        except DECODE_ERRORS:
+            raise NotFound()
+        response = FileResponse(
+            file, content_type=f"image/{image_format.lower()}"
+        )
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.RECIPE_IMAGE_VARIANT_MAX_AGE,
+            immutable=True,
+        )
+        return response
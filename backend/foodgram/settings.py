@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 
 from pathlib import Path
 
@@ -93,6 +94,59 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+API_CACHE_ALIAS = 'api'
+API_VERSIONS_CACHE_ALIAS = 'api-versions'
+API_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+API_CACHE_TIMEOUT = 300
+RECIPE_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    API_CACHE_ALIAS: {
+        'BACKEND': API_CACHE_BACKENDS[
+            os.getenv('API_CACHE_BACKEND', default='locmem')
+        ],
+        'LOCATION': os.getenv('API_CACHE_LOCATION', default='foodgram-api'),
+        'TIMEOUT': API_CACHE_TIMEOUT,
+    },
+}
+# Счётчики версий, по которым сбрасываются кэши ответов и карточек рецептов,
+# должны быть общими для всех процессов (воркеров gunicorn и команд
+# управления). Кэш в памяти процесса для этого не подходит, поэтому
+# без redis они хранятся в файлах в API_VERSIONS_LOCATION.
+if os.getenv('API_CACHE_BACKEND') == 'redis':
+    CACHES[API_VERSIONS_CACHE_ALIAS] = dict(
+        CACHES[API_CACHE_ALIAS], TIMEOUT=None
+    )
+else:
+    CACHES[API_VERSIONS_CACHE_ALIAS] = {
+        'BACKEND': API_CACHE_BACKENDS['file'],
+        'LOCATION': os.getenv(
+            'API_VERSIONS_LOCATION',
+            default=os.path.join(
+                tempfile.gettempdir(), 'foodgram-api-versions'
+            ),
+        ),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    }
+
+# File uploads
+# https://docs.djangoproject.com/en/3.2/topics/http/file-uploads/
+
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -118,6 +172,15 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'api.parsers.MultiPartJSONParser',
+    ],
 }
 
 DJOSER = {
@@ -172,5 +235,57 @@ MAX_COUNT_CHARS_SEVEN = 7
 
 SIX_ELEMENTS_ON_PAGE = 6
 
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 1000
+
+BULK_RECIPES_MAX_ITEMS = 100
+
+SHOPPING_LIST_CHUNK_SIZE = 500
+SHOPPING_LIST_PDF_CHUNK_SIZE = 64 * 1024
+SHOPPING_LIST_PDF_FONT = os.getenv('SHOPPING_LIST_PDF_FONT', default='')
+
+TASKS_ASYNC = os.getenv('TASKS_ASYNC', default='True') == 'True'
+TASKS_WORKERS = int(os.getenv('TASKS_WORKERS', default=2))
+
+FEED_FANOUT_LIMIT = 1000
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_BACKFILL_SIZE = 100
+
+FUZZY_SEARCH_THRESHOLD = float(
+    os.getenv('FUZZY_SEARCH_THRESHOLD', default=0.3)
+)
+INGREDIENT_AUTOCOMPLETE_LIMIT = 20
+INGREDIENT_CACHE_MAX_AGE = 60 * 60
+INGREDIENT_SNAPSHOT_MAX_AGE = 60 * 60 * 24 * 365
+INGREDIENT_VERSION_TIMEOUT = 5
+INGREDIENT_IMPORT_BATCH_SIZE = 1000
+
+RECIPE_IMAGE_MAX_SIZE = 1280
+RECIPE_IMAGE_FORMAT = os.getenv('RECIPE_IMAGE_FORMAT', default='WEBP')
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_VARIANT_SIZES = (200, 400, 800)
+RECIPE_IMAGE_VARIANT_MAX_AGE = 60 * 60 * 24 * 365
+RECIPE_IMAGE_VARIANTS_ROOT = os.getenv(
+    'RECIPE_IMAGE_VARIANTS_ROOT',
+    default=os.path.join(BASE_DIR, 'cache', 'images')
+)
+RECIPE_IMAGE_VARIANTS_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_VARIANTS_MAX_SIZE', default=256 * 1024 * 1024)
+)
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['OPTIONS'] = {
+        'options': (
+            '-c pg_trgm.word_similarity_threshold='
+            f'{FUZZY_SEARCH_THRESHOLD}'
+        ),
+    }
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Тестовая база SQLite в файле: в общей базе в памяти параллельные
+    # соединения из потоков сразу получают ошибку блокировки таблицы.
+    DATABASES['default']['TEST'] = {
+        'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+    }
+
 MIN_VALUE_IS_ONE = 1
 MIN_VALUE_IS_NULL = 0
@@ -40,6 +40,7 @@ class RecipeAdmin(admin.ModelAdmin):
         "name",
         "author__username",
         "tags__name",
+        "image_status",
     )
     readonly_fields = ("count_favorites",)
     inlines = (IngredientInline,)
@@ -49,8 +50,9 @@ class RecipeAdmin(admin.ModelAdmin):
         """
         Возвращает количество добавлений рецепта в избранное.
         """
-        return obj.favorites.count()
+        return obj.favorites_count
     count_favorites.short_description = "Избранное"
+    count_favorites.admin_order_field = "favorites_count"
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -10,3 +10,10 @@ class RecipesConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        """
+        Подключает обработчики сигналов обновления счётчиков,
+        списков покупок и лент подписок.
+        """
+        import recipes.signals  # noqa: F401
@@ -0,0 +1,94 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+RECIPE_COUNTERS = {
+    "favorites_count": (Favorite, "recipe"),
+    "carts_count": (ShoppingCart, "recipe"),
+}
+USER_COUNTERS = {
+    "recipes_count": (Recipe, "author"),
+    "subscribers_count": (Subscription, "author"),
+}
+
+
+def count_subquery(model, field):
+    """
+    Возвращает подзапрос количества объектов модели,
+    ссылающихся полем 'field' на внешний объект.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0
+    )
+
+
+def increment(model, pk, field, delta):
+    """
+    Изменяет счётчик 'field' объекта на 'delta' одним UPDATE,
+    не опуская значение ниже нуля.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def recompute(queryset, counters):
+    """
+    Пересчитывает счётчики объектов выборки одним UPDATE.
+    """
+    return queryset.update(
+        **{
+            name: count_subquery(model, field)
+            for name, (model, field) in counters.items()
+        }
+    )
+
+
+def find_drift(queryset, counters):
+    """
+    Возвращает выборку объектов, у которых хотя бы один счётчик
+    расходится с фактическим количеством.
+    """
+    annotations = {
+        f"actual_{name}": count_subquery(model, field)
+        for name, (model, field) in counters.items()
+    }
+    return queryset.annotate(**annotations).filter(
+        reduce(
+            or_,
+            (~Q(**{name: F(f"actual_{name}")}) for name in counters)
+        )
+    )
+
+
+def recompute_recipe_counters(recipe_ids=None):
+    """
+    Пересчитывает счётчики рецептов (всех или перечисленных).
+    """
+    recipes = Recipe.objects.all()
+    if recipe_ids is not None:
+        recipes = recipes.filter(pk__in=recipe_ids)
+    return recompute(recipes, RECIPE_COUNTERS)
+
+
+def recompute_user_counters(user_ids=None):
+    """
+    Пересчитывает счётчики пользователей (всех или перечисленных).
+    """
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    return recompute(users, USER_COUNTERS)
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription, User
+
+
+def is_fanned_out(author_id):
+    """
+    Проверяет, раскладываются ли рецепты автора по лентам подписчиков.
+    Рецепты авторов с числом подписчиков больше FEED_FANOUT_LIMIT
+    в ленты не записываются и читаются напрямую при запросе ленты.
+    """
+    return User.objects.filter(
+        pk=author_id,
+        subscribers_count__lte=settings.FEED_FANOUT_LIMIT,
+    ).exists()
+
+
+def create_entries(entries):
+    """
+    Создаёт записи лент, пропуская уже существующие.
+    """
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out(recipe_id):
+    """
+    Добавляет новый рецепт в ленты всех подписчиков его автора.
+    """
+    author_id = Recipe.objects.filter(pk=recipe_id).values_list(
+        "author_id", flat=True
+    ).first()
+    if author_id is None or not is_fanned_out(author_id):
+        return
+    subscribers = Subscription.objects.filter(
+        author_id=author_id
+    ).values_list("user_id", flat=True).iterator(
+        chunk_size=settings.FEED_FANOUT_BATCH_SIZE
+    )
+    create_entries(
+        FeedEntry(user_id=user_id, recipe_id=recipe_id, author_id=author_id)
+        for user_id in subscribers
+    )
+
+
+def backfill(user_id, author_id):
+    """
+    Добавляет в ленту пользователя последние рецепты автора,
+    на которого он подписался (не больше FEED_BACKFILL_SIZE).
+    """
+    if not is_fanned_out(author_id) or not Subscription.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).exists():
+        return
+    recipe_ids = Recipe.objects.filter(author_id=author_id).order_by(
+        "-pub_date", "-id"
+    ).values_list("id", flat=True)[:settings.FEED_BACKFILL_SIZE]
+    create_entries(
+        FeedEntry(user_id=user_id, recipe_id=recipe_id, author_id=author_id)
+        for recipe_id in recipe_ids
+    )
+
+
+def prune(user_id, author_id):
+    """
+    Удаляет из ленты пользователя рецепты автора, от которого он отписался.
+    """
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def get_feed(user):
+    """
+    Возвращает выборку рецептов ленты пользователя:
+    рецепты из его ленты и рецепты авторов с большим числом подписчиков,
+    на которых он подписан.
+    """
+    read_authors = Subscription.objects.filter(
+        user=user,
+        author__subscribers_count__gt=settings.FEED_FANOUT_LIMIT,
+    ).values("author_id")
+    return Recipe.objects.filter(
+        Q(pk__in=FeedEntry.objects.filter(user=user).values("recipe_id"))
+        | Q(author__in=read_authors)
+    )
+
+
+def get_missing_subscriptions():
+    """
+    Возвращает подписки на авторов с рецептами, раскладываемых по лентам,
+    для которых в ленте подписчика нет ни одного рецепта автора.
+    """
+    return Subscription.objects.filter(
+        author__subscribers_count__lte=settings.FEED_FANOUT_LIMIT,
+        author__recipes_count__gt=0,
+    ).exclude(
+        Exists(FeedEntry.objects.filter(
+            user_id=OuterRef("user_id"), author_id=OuterRef("author_id")
+        ))
+    )
+
+
+def find_drift():
+    """
+    Возвращает количество подписок без записей в ленте подписчика.
+    """
+    return get_missing_subscriptions().count()
+
+
+def rebuild():
+    """
+    Заполняет ленты по подпискам, для которых записей в ленте нет.
+    """
+    for user_id, author_id in get_missing_subscriptions().values_list(
+        "user_id", "author_id"
+    ).iterator():
+        backfill(user_id, author_id)
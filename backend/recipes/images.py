@@ -0,0 +1,123 @@
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, features
+
+from recipes.models import (
+    IMAGE_FAILED,
+    IMAGE_PENDING,
+    IMAGE_READY,
+    Recipe
+)
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+DECODE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def get_format():
+    """
+    Возвращает формат обработанных изображений из RECIPE_IMAGE_FORMAT.
+    Если Pillow собран без поддержки WebP, используется JPEG.
+    """
+    image_format = settings.RECIPE_IMAGE_FORMAT.upper()
+    if image_format == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return image_format if image_format in EXTENSIONS else "JPEG"
+
+
+def encode(file, width, height=None):
+    """
+    Декодирует изображение, поворачивает его по EXIF,
+    уменьшает до ширины 'width' (и высоты 'height', если она задана)
+    и перекодирует без метаданных.
+    Возвращает содержимое файла и его расширение.
+    """
+    side = max(width, height or 0)
+    image_format = get_format()
+    with Image.open(file) as image:
+        image.draft("RGB", (side, side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width, height or image.height))
+        if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+            has_alpha = image_format != "JPEG" and (
+                image.mode in ("LA", "PA") or "transparency" in image.info
+            )
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        content = BytesIO()
+        image.save(
+            content,
+            image_format,
+            quality=settings.RECIPE_IMAGE_QUALITY,
+        )
+    return content.getvalue(), EXTENSIONS[image_format]
+
+
+def process_image(recipe_id, name):
+    """
+    Обрабатывает загруженное изображение рецепта и подменяет им исходное.
+    Если изображение рецепта за это время заменили или рецепт удалили,
+    результат отбрасывается. Исходный файл удаляется после замены,
+    а при ошибке декодирования остаётся, и рецепт получает
+    состояние IMAGE_FAILED.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id, image=name).first()
+    if recipe is None:
+        return
+    storage = recipe.image.storage
+    try:
+        with storage.open(name, "rb") as file:
+            content, extension = encode(
+                file,
+                settings.RECIPE_IMAGE_MAX_SIZE,
+                settings.RECIPE_IMAGE_MAX_SIZE,
+            )
+    except DECODE_ERRORS:
+        logger.warning(
+            "Не удалось обработать изображение %s рецепта %s",
+            name, recipe_id, exc_info=True
+        )
+        processed = None
+    else:
+        stem = os.path.splitext(os.path.basename(name))[0]
+        processed = storage.save(
+            recipe.image.field.generate_filename(
+                recipe, f"{stem}.{extension}"
+            ),
+            ContentFile(content),
+        )
+    with transaction.atomic():
+        recipe = Recipe.objects.select_for_update().filter(
+            pk=recipe_id, image=name, image_status=IMAGE_PENDING
+        ).first()
+        if recipe is not None:
+            if processed:
+                recipe.image.name = processed
+            recipe.image_status = IMAGE_READY if processed else IMAGE_FAILED
+            recipe.save(update_fields=["image", "image_status", "updated_at"])
+    if recipe is None:
+        if processed:
+            storage.delete(processed)
+    elif processed:
+        storage.delete(name)
+
+
+def process_pending():
+    """
+    Обрабатывает все изображения, ожидающие обработки,
+    например оставшиеся в очереди после перезапуска сервера.
+    Возвращает количество обработанных изображений.
+    """
+    pending = Recipe.objects.filter(
+        image_status=IMAGE_PENDING
+    ).values_list("pk", "image")
+    count = 0
+    for recipe_id, name in pending.iterator():
+        process_image(recipe_id, name)
+        count += 1
+    return count
@@ -1,6 +1,10 @@
 import csv
+from itertools import islice
+from time import perf_counter
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from recipes.models import Ingredient
 
@@ -8,27 +12,175 @@ from recipes.models import Ingredient
 class Command(BaseCommand):
     """
     Команда управления Django для импорта ингредиентов из CSV-файла.
+    Файл читается потоково и загружается пачками, уже существующие
+    ингредиенты (по названию и единице измерения) пропускаются,
+    поэтому команду можно запускать повторно для обновления справочника.
     """
-    def handle(self, *args, **kwargs):
+    help = "Импортирует ингредиенты из CSV-файла (название, единица)."
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды.
+        """
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="data/ingredients.csv",
+            help="Путь к CSV-файлу.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.INGREDIENT_IMPORT_BATCH_SIZE,
+            help="Количество строк в одном запросе на вставку.",
+        )
+        parser.add_argument(
+            "--header",
+            action="store_true",
+            help="Пропустить первую строку файла с заголовками.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только посчитать новые ингредиенты, ничего не меняя.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Загрузить файл командой COPY (только PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
         """
         Метод обработки команды для импорта ингредиентов.
         """
-        if Ingredient.objects.exists():
-            self.stdout.write("Данные были загружены ранее.")
-            return
-        path_csv = "data/ingredients.csv"
-        self._import_ingredients(path_csv)
-        self.stdout.write("Данные успешно загружены.")
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пачки должен быть больше нуля.")
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("COPY доступен только для PostgreSQL.")
+        start = perf_counter()
+        before = Ingredient.objects.count()
+        try:
+            with open(options["path"], encoding="utf-8", newline="") as file:
+                if options["dry_run"]:
+                    created = self._count_new(file, options)
+                elif options["copy"]:
+                    self._copy(file, options)
+                    created = Ingredient.objects.count() - before
+                else:
+                    self._import_ingredients(file, options)
+                    created = Ingredient.objects.count() - before
+        except OSError as error:
+            raise CommandError(f"Не удалось прочитать файл: {error}")
+        elapsed = perf_counter() - start
+        prefix = "Будет добавлено" if options["dry_run"] else "Добавлено"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} ингредиентов: {created}, "
+            f"было: {before}, время: {elapsed:.2f} с."
+        ))
+
+    def _read_rows(self, file, options):
+        """
+        Возвращает генератор пар (название, единица измерения)
+        из CSV-файла, пропуская пустые и некорректные строки.
+        """
+        max_length = settings.MAX_COUNT_CHARS_TWO_HUNDRED
+        reader = csv.reader(file)
+        if options["header"]:
+            next(reader, None)
+        first_line = 2 if options["header"] else 1
+        for line, row in enumerate(reader, start=first_line):
+            values = [value.strip() for value in row[:2]]
+            if len(values) < 2 or not all(values) or any(
+                len(value) > max_length for value in values
+            ):
+                if any(row):
+                    self.stderr.write(f"Пропущена строка {line}: {row}")
+                continue
+            yield tuple(values)
+
+    def _batches(self, file, options):
+        """
+        Возвращает генератор пачек строк файла размером 'batch_size'.
+        """
+        rows = self._read_rows(file, options)
+        while True:
+            batch = list(islice(rows, options["batch_size"]))
+            if not batch:
+                return
+            yield batch
 
-    def _import_ingredients(self, path_csv):
+    def _progress(self, processed, start):
         """
-        Импорт ингредиентов из CSV-файла.
+        Выводит количество обработанных строк и скорость загрузки.
         """
-        with open(path_csv, encoding="utf-8") as csvfile:
-            reader_csv = csv.reader(csvfile)
-            next(reader_csv)
-            for row in reader_csv:
-                Ingredient.objects.create(
-                    name=row[0],
-                    measurement_unit=row[1]
+        elapsed = perf_counter() - start
+        rate = processed / elapsed if elapsed else processed
+        self.stdout.write(
+            f"Обработано строк: {processed} ({rate:.0f} строк/с)"
+        )
+
+    def _import_ingredients(self, file, options):
+        """
+        Импорт ингредиентов из CSV-файла пачками bulk_create
+        с пропуском уже существующих.
+        """
+        start = perf_counter()
+        processed = 0
+        with transaction.atomic():
+            for batch in self._batches(file, options):
+                Ingredient.objects.bulk_create(
+                    (
+                        Ingredient(name=name, measurement_unit=unit)
+                        for name, unit in batch
+                    ),
+                    ignore_conflicts=True,
                 )
+                processed += len(batch)
+                self._progress(processed, start)
+
+    def _count_new(self, file, options):
+        """
+        Считает ингредиенты из файла, которых ещё нет в базе.
+        """
+        existing = set(
+            Ingredient.objects.values_list("name", "measurement_unit")
+        )
+        start = perf_counter()
+        processed = 0
+        new = set()
+        for batch in self._batches(file, options):
+            new.update(row for row in batch if row not in existing)
+            processed += len(batch)
+            self._progress(processed, start)
+        return len(new)
+
+    def _copy(self, file, options):
+        """
+        Загружает файл во временную таблицу командой COPY
+        и переносит новые ингредиенты одним запросом.
+        """
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        max_length = settings.MAX_COUNT_CHARS_TWO_HUNDRED
+        header = ", HEADER true" if options["header"] else ""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE ingredient_import "
+                "(name text, measurement_unit text) ON COMMIT DROP"
+            )
+            cursor.copy_expert(
+                "COPY ingredient_import FROM STDIN "
+                f"WITH (FORMAT csv{header})",
+                file,
+            )
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit, updated_at) "
+                "SELECT DISTINCT trim(name), trim(measurement_unit), now() "
+                "FROM ingredient_import "
+                "WHERE length(trim(coalesce(name, ''))) "
+                "BETWEEN 1 AND %(max_length)s "
+                "AND length(trim(coalesce(measurement_unit, ''))) "
+                "BETWEEN 1 AND %(max_length)s "
+                "ON CONFLICT (name, measurement_unit) DO NOTHING",
+                {"max_length": max_length},
+            )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from recipes import images
+
+
+class Command(BaseCommand):
+    """
+    Команда управления Django для обработки изображений рецептов,
+    оставшихся в очереди, например после перезапуска сервера.
+    """
+    help = "Обрабатывает изображения рецептов, ожидающие обработки."
+
+    def handle(self, *args, **options):
+        """
+        Метод обработки команды обработки изображений.
+        """
+        count = images.process_pending()
+        self.stdout.write(f"Обработано изображений - {count}.")
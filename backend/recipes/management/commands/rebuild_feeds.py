@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recipes import feeds
+
+
+class Command(BaseCommand):
+    """
+    Команда управления Django для проверки и заполнения
+    лент подписок пользователей.
+    """
+    help = "Проверяет и заполняет ленты подписок."
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды.
+        """
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только показать количество расхождений, ничего не меняя.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Метод обработки команды заполнения лент подписок.
+        """
+        drift = feeds.find_drift()
+        self.stdout.write(f"Подписок без записей в ленте - {drift}.")
+        if drift and not options["check"]:
+            feeds.rebuild()
+            self.stdout.write("Ленты подписок заполнены.")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recipes import shopping_lists
+
+
+class Command(BaseCommand):
+    """
+    Команда управления Django для проверки и пересборки
+    сводных списков покупок пользователей.
+    """
+    help = "Проверяет и пересобирает сводные списки покупок."
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды.
+        """
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только показать количество расхождений, ничего не меняя.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Метод обработки команды пересборки списков покупок.
+        """
+        drift = shopping_lists.find_drift()
+        self.stdout.write(f"Расхождений в списках покупок - {drift}.")
+        if drift and not options["check"]:
+            shopping_lists.rebuild()
+            self.stdout.write("Списки покупок пересобраны.")
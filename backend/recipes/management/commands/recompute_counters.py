@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import (
+    RECIPE_COUNTERS,
+    USER_COUNTERS,
+    find_drift,
+    recompute
+)
+from recipes.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Команда управления Django для пересчёта денормализованных счётчиков
+    рецептов и пользователей.
+    """
+    help = (
+        "Пересчитывает счётчики избранного, покупок, рецептов и подписчиков."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды.
+        """
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только показать количество расхождений, ничего не меняя.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Метод обработки команды пересчёта счётчиков.
+        """
+        targets = (
+            ("Рецепты", Recipe.objects.all(), RECIPE_COUNTERS),
+            ("Пользователи", User.objects.all(), USER_COUNTERS),
+        )
+        with transaction.atomic():
+            for label, queryset, counters in targets:
+                drift = find_drift(queryset, counters).count()
+                self.stdout.write(f"{label}: расхождений - {drift}.")
+                if drift and not options["check"]:
+                    recompute(queryset, counters)
+        if not options["check"]:
+            self.stdout.write("Счётчики пересчитаны.")
@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Sum
+
+
+def backfill_shopping_lists(apps, schema_editor):
+    IngredientRecipe = apps.get_model("recipes", "IngredientRecipe")
+    ShoppingListItem = apps.get_model("recipes", "ShoppingListItem")
+    totals = IngredientRecipe.objects.filter(
+        recipe__carts__isnull=False
+    ).order_by().values(
+        "recipe__carts__user_id", "ingredient_id"
+    ).annotate(total=Sum("amount"))
+    ShoppingListItem.objects.bulk_create(
+        (
+            ShoppingListItem(
+                user_id=row["recipe__carts__user_id"],
+                ingredient_id=row["ingredient_id"],
+                amount=row["total"],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_shopping_lists, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_feeds(apps, schema_editor):
+    FeedEntry = apps.get_model("recipes", "FeedEntry")
+    Recipe = apps.get_model("recipes", "Recipe")
+    Subscription = apps.get_model("users", "Subscription")
+    subscriptions = Subscription.objects.filter(
+        author__subscribers_count__lte=settings.FEED_FANOUT_LIMIT,
+        author__recipes_count__gt=0,
+    ).values_list("user_id", "author_id")
+    for user_id, author_id in subscriptions.iterator():
+        recipe_ids = Recipe.objects.filter(author_id=author_id).order_by(
+            "-pub_date", "-id"
+        ).values_list("id", flat=True)[:settings.FEED_BACKFILL_SIZE]
+        FeedEntry.objects.bulk_create(
+            FeedEntry(
+                user_id=user_id, recipe_id=recipe_id, author_id=author_id
+            )
+            for recipe_id in recipe_ids
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_feedentry'),
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,9 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Value
 from django.core.validators import RegexValidator
 
-from users.models import User
+from users.models import Subscription, User
 from api.validators import (
     validate_cooking_time,
     validate_ingredients,
@@ -10,6 +11,15 @@ from api.validators import (
     validate_tags
 )
 
+IMAGE_PENDING = "pending"
+IMAGE_READY = "ready"
+IMAGE_FAILED = "failed"
+IMAGE_STATUSES = (
+    (IMAGE_PENDING, "Обрабатывается"),
+    (IMAGE_READY, "Готово"),
+    (IMAGE_FAILED, "Ошибка обработки"),
+)
+
 
 class Ingredient(models.Model):
     """
@@ -24,6 +34,11 @@ class Ingredient(models.Model):
         max_length=settings.MAX_COUNT_CHARS_TWO_HUNDRED,
         verbose_name="Единицы измерения"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Дата изменения"
+    )
 
     class Meta():
         """
@@ -94,6 +109,54 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    """
+    QuerySet для модели Recipe.
+    Содержит методы подготовки выборки рецептов к чтению.
+    """
+
+    def with_related(self):
+        """
+        Подгружает автора, теги и ингредиенты рецептов
+        фиксированным числом запросов.
+        """
+        return self.select_related("author").prefetch_related(
+            "tags",
+            Prefetch(
+                "ingredientrecipe",
+                queryset=IngredientRecipe.objects.select_related(
+                    "ingredient"
+                )
+            ),
+        )
+
+    def with_user_flags(self, user):
+        """
+        Добавляет аннотации is_favorited, is_in_shopping_cart
+        и author_is_subscribed для текущего пользователя.
+        """
+        if not user.is_authenticated:
+            false = Value(False, output_field=models.BooleanField())
+            return self.annotate(
+                is_favorited=false,
+                is_in_shopping_cart=false,
+                author_is_subscribed=false,
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            author_is_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=user, author=OuterRef("author")
+                )
+            ),
+        )
+
+
 class Recipe(models.Model):
     """
     Модель для рецепта.
@@ -124,6 +187,13 @@ class Recipe(models.Model):
         upload_to="recipes/image/",
         verbose_name="Изображение"
     )
+    image_status = models.CharField(
+        max_length=settings.MAX_COUNT_CHARS_SEVEN,
+        choices=IMAGE_STATUSES,
+        default=IMAGE_READY,
+        editable=False,
+        verbose_name="Состояние изображения"
+    )
     cooking_time = models.PositiveSmallIntegerField(
         validators=[validate_cooking_time],
         verbose_name="Время готовки"
@@ -132,15 +202,39 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name="Дата публикации"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Дата изменения"
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Добавлений в избранное"
+    )
+    carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Добавлений в список покупок"
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         """
         Метакласс для модели Recipe.
         Определяет метаданные модели Recipe, такие как
-        сортировку по дате публикации (сначало новые)
+        сортировку по дате публикации (сначало новые),
+        индекс для курсорной пагинации
         и названия модели в единственном и множественном числе.
         """
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="recipe_pub_date_id_idx"
+            )
+        ]
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
 
@@ -271,3 +365,105 @@ class ShoppingCart(models.Model):
         Возвращает строковое представление списка покупок.
         """
         return f"{self.user} добавил {self.recipe.name} в список покупок"
+
+
+class ShoppingListItem(models.Model):
+    """
+    Модель строки сводного списка покупок пользователя:
+    суммарное количество ингредиента по всем рецептам
+    из списка покупок. Поддерживается в актуальном состоянии
+    при изменении списка покупок и ингредиентов рецептов.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list",
+        verbose_name="Пользователь"
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Ингредиент"
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name="Суммарное количество"
+    )
+
+    class Meta:
+        """
+        Метакласс для модели ShoppingListItem.
+        Определяет метаданные модели ShoppingListItem,
+        такие как ограничение уникальности поля "user" и "ingredient",
+        а также названия модели в единственном и множественном числе.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"],
+                name="unique_user_ingredient_shopping_list"
+            )
+        ]
+        verbose_name = "Строка сводного списка покупок"
+        verbose_name_plural = "Сводные списки покупок"
+
+    def __str__(self):
+        """
+        Возвращает строковое представление строки списка покупок.
+        """
+        return f"{self.user}: {self.ingredient} - {self.amount}"
+
+
+class FeedEntry(models.Model):
+    """
+    Модель записи ленты подписок пользователя:
+    рецепт автора, на которого подписан пользователь.
+    Заполняется при публикации рецепта и при новой подписке,
+    очищается при отписке.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed",
+        verbose_name="Пользователь"
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name="Рецепт"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор рецепта"
+    )
+
+    class Meta:
+        """
+        Метакласс для модели FeedEntry.
+        Определяет метаданные модели FeedEntry,
+        такие как ограничение уникальности полей "user" и "recipe",
+        индекс для очистки ленты при отписке,
+        а также названия модели в единственном и множественном числе.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_user_recipe_feed"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "author"],
+                name="feed_user_author_idx"
+            )
+        ]
+        verbose_name = "Запись ленты подписок"
+        verbose_name_plural = "Ленты подписок"
+
+    def __str__(self):
+        """
+        Возвращает строковое представление записи ленты.
+        """
+        return f"{self.user}: {self.recipe}"
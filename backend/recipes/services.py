@@ -0,0 +1,273 @@
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models.signals import post_save
+
+from recipes import shopping_lists
+from recipes.counters import recompute_recipe_counters
+from recipes.models import IngredientRecipe, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+ADDED = "added"
+REMOVED = "removed"
+ALREADY_ADDED = "already_added"
+NOT_ADDED = "not_added"
+NOT_FOUND = "not_found"
+
+
+UPSERT_VENDORS = ("postgresql", "sqlite")
+
+
+def insert_ignore(model, parent_model, parent_field, **fields):
+    """
+    Вставляет объект модели одним запросом
+    INSERT ... SELECT ... WHERE EXISTS (родитель) ON CONFLICT DO NOTHING,
+    если родительский объект существует и такой объект ещё не создан.
+    Возвращает созданный объект или None.
+    После вставки отправляет сигнал post_save, как при обычном сохранении.
+    Для СУБД без ON CONFLICT ... RETURNING используется вставка
+    в точке сохранения с перехватом IntegrityError.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if connection.vendor not in UPSERT_VENDORS:
+        if not parent_model.objects.filter(pk=fields[parent_field]).exists():
+            return None
+        try:
+            with transaction.atomic(using=using):
+                return model.objects.create(**fields)
+        except IntegrityError:
+            return None
+    quote = connection.ops.quote_name
+    opts = model._meta
+    columns = ", ".join(
+        quote(opts.get_field(name).column) for name in fields
+    )
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({columns}) "
+        f"SELECT {placeholders} WHERE EXISTS ("
+        f"SELECT 1 FROM {quote(parent_model._meta.db_table)} "
+        f"WHERE {quote(parent_model._meta.pk.column)} = %s) "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(opts.pk.column)}"
+    )
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*fields.values(), fields[parent_field]])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        instance = model(pk=row[0], **fields)
+        instance._state.adding = False
+        instance._state.db = using
+        post_save.send(
+            sender=model,
+            instance=instance,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=using,
+        )
+    return instance
+
+
+def delete_rows(model, pks):
+    """
+    Удаляет объекты модели с переданными первичными ключами
+    одним запросом DELETE, без загрузки объектов и сигналов.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(opts.db_table)} "
+            f"WHERE {quote(opts.pk.column)} IN ({placeholders})",
+            list(pks),
+        )
+
+
+def add_user_recipe(model, user, recipe_id):
+    """
+    Добавляет рецепт в избранное или список покупок пользователя
+    ('model' - Favorite или ShoppingCart) одним запросом.
+    Возвращает ADDED, ALREADY_ADDED или NOT_FOUND.
+    """
+    if insert_ignore(
+        model, Recipe, "recipe_id", user_id=user.id, recipe_id=recipe_id
+    ):
+        return ADDED
+    if Recipe.objects.filter(pk=recipe_id).exists():
+        return ALREADY_ADDED
+    return NOT_FOUND
+
+
+def remove_user_recipe(model, user, recipe_id):
+    """
+    Удаляет рецепт из избранного или списка покупок пользователя.
+    Возвращает REMOVED, NOT_ADDED или NOT_FOUND.
+    """
+    deleted, _ = model.objects.filter(
+        user=user, recipe_id=recipe_id
+    ).delete()
+    if deleted:
+        return REMOVED
+    if Recipe.objects.filter(pk=recipe_id).exists():
+        return NOT_ADDED
+    return NOT_FOUND
+
+
+def subscribe(user, author_id):
+    """
+    Подписывает пользователя на автора одним запросом.
+    Возвращает созданную подписку или статус ALREADY_ADDED / NOT_FOUND.
+    """
+    subscription = insert_ignore(
+        Subscription, User, "author_id", user_id=user.id, author_id=author_id
+    )
+    if subscription:
+        return subscription
+    if User.objects.filter(pk=author_id).exists():
+        return ALREADY_ADDED
+    return NOT_FOUND
+
+
+def unsubscribe(user, author_id):
+    """
+    Отписывает пользователя от автора.
+    Возвращает REMOVED, NOT_ADDED или NOT_FOUND.
+    """
+    deleted, _ = Subscription.objects.filter(
+        user=user, author_id=author_id
+    ).delete()
+    if deleted:
+        return REMOVED
+    if User.objects.filter(pk=author_id).exists():
+        return NOT_ADDED
+    return NOT_FOUND
+
+
+def unique(ids):
+    """
+    Возвращает список id без повторов с сохранением порядка.
+    """
+    return list(dict.fromkeys(ids))
+
+
+@transaction.atomic
+def bulk_update_user_recipes(model, user, add_ids=(), remove_ids=()):
+    """
+    Добавляет и удаляет рецепты в избранном или списке покупок
+    пользователя ('model' - Favorite или ShoppingCart) в одной транзакции.
+    Вставка выполняется одним bulk_create, удаление - одним DELETE
+    без построчных сигналов, после чего счётчики рецептов и сводный
+    список покупок пересчитываются один раз для всех изменённых рецептов.
+    Возвращает список результатов по каждому переданному id.
+    """
+    add_ids, remove_ids = unique(add_ids), unique(remove_ids)
+    requested = set(add_ids) | set(remove_ids)
+    existing = set(
+        Recipe.objects.filter(pk__in=requested).values_list("pk", flat=True)
+    )
+    current = dict(
+        model.objects.select_for_update().filter(
+            user=user, recipe_id__in=requested
+        ).values_list("recipe_id", "pk")
+    )
+    results = []
+    to_add = []
+    for recipe_id in add_ids:
+        if recipe_id not in existing:
+            status = NOT_FOUND
+        elif recipe_id in current:
+            status = ALREADY_ADDED
+        else:
+            status = ADDED
+            to_add.append(recipe_id)
+        results.append({"id": recipe_id, "action": "add", "status": status})
+    to_remove = []
+    for recipe_id in remove_ids:
+        if recipe_id not in existing:
+            status = NOT_FOUND
+        elif recipe_id not in current:
+            status = NOT_ADDED
+        else:
+            status = REMOVED
+            to_remove.append(recipe_id)
+        results.append(
+            {"id": recipe_id, "action": "remove", "status": status}
+        )
+    if to_remove:
+        delete_rows(
+            model, [current[recipe_id] for recipe_id in to_remove]
+        )
+    if to_add:
+        model.objects.bulk_create(
+            [model(user=user, recipe_id=recipe_id) for recipe_id in to_add],
+            ignore_conflicts=True,
+        )
+    changed = to_add + to_remove
+    if changed:
+        recompute_recipe_counters(changed)
+        if model is ShoppingCart:
+            shopping_lists.rebuild(
+                [user.id],
+                set(
+                    IngredientRecipe.objects.filter(recipe_id__in=changed)
+                    .values_list("ingredient_id", flat=True)
+                ),
+            )
+    return results
+
+
+@transaction.atomic
+def sync_recipe_ingredients(recipe, ingredients):
+    """
+    Приводит ингредиенты рецепта к переданному списку пар
+    (ингредиент, количество), применяя только разницу:
+    удаляет лишние строки, меняет количество у изменившихся
+    и добавляет новые - постоянным числом запросов.
+    Строки удаляются, изменяются и добавляются без построчных сигналов,
+    поэтому дата изменения рецепта и сводные списки покупок
+    по всем изменившимся ингредиентам обновляются здесь же, один раз.
+    Возвращает True, если что-то изменилось.
+    """
+    current = {
+        ingredient_id: (pk, amount)
+        for pk, ingredient_id, amount in IngredientRecipe.objects.filter(
+            recipe=recipe
+        ).values_list("pk", "ingredient_id", "amount")
+    }
+    amounts = {ingredient.pk: amount for ingredient, amount in ingredients}
+    removed = current.keys() - amounts.keys()
+    changed = [
+        IngredientRecipe(
+            pk=current[ingredient_id][0],
+            ingredient_id=ingredient_id,
+            amount=amount
+        )
+        for ingredient_id, amount in amounts.items()
+        if ingredient_id in current and current[ingredient_id][1] != amount
+    ]
+    added = [
+        IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=amount)
+        for ingredient, amount in ingredients
+        if ingredient.pk not in current
+    ]
+    if removed:
+        delete_rows(
+            IngredientRecipe,
+            [current[ingredient_id][0] for ingredient_id in removed],
+        )
+    if changed:
+        IngredientRecipe.objects.bulk_update(changed, ["amount"])
+    if added:
+        IngredientRecipe.objects.bulk_create(added)
+    changed_ids = set(removed) | {
+        item.ingredient_id for item in changed + added
+    }
+    if not changed_ids:
+        return False
+    recipe.save(update_fields=["updated_at"])
+    shopping_lists.recipe_ingredients_changed(recipe.pk, changed_ids)
+    return True
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+
+from recipes.models import IngredientRecipe, ShoppingCart, ShoppingListItem
+
+
+def get_recipe_totals(recipe_id):
+    """
+    Возвращает словарь {id ингредиента: количество} для рецепта.
+    """
+    return dict(
+        IngredientRecipe.objects.filter(recipe_id=recipe_id)
+        .order_by()
+        .values("ingredient_id")
+        .annotate(total=Sum("amount"))
+        .values_list("ingredient_id", "total")
+    )
+
+
+def amount_case(totals):
+    """
+    Возвращает выражение количества ингредиента из словаря totals
+    для UPDATE строк списка покупок.
+    """
+    return Case(
+        *(
+            When(ingredient_id=ingredient_id, then=Value(total))
+            for ingredient_id, total in totals.items()
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+@transaction.atomic
+def add_recipe(user_id, recipe_id):
+    """
+    Добавляет ингредиенты рецепта в сводный список покупок пользователя.
+    """
+    totals = get_recipe_totals(recipe_id)
+    if not totals:
+        return
+    ShoppingListItem.objects.bulk_create(
+        [
+            ShoppingListItem(
+                user_id=user_id, ingredient_id=ingredient_id, amount=0
+            )
+            for ingredient_id in totals
+        ],
+        ignore_conflicts=True,
+    )
+    ShoppingListItem.objects.filter(
+        user_id=user_id, ingredient_id__in=totals
+    ).update(amount=F("amount") + amount_case(totals))
+
+
+@transaction.atomic
+def remove_recipe(user_id, recipe_id):
+    """
+    Вычитает ингредиенты рецепта из сводного списка покупок пользователя
+    и удаляет строки с нулевым количеством.
+    """
+    totals = get_recipe_totals(recipe_id)
+    if not totals:
+        return
+    items = ShoppingListItem.objects.filter(
+        user_id=user_id, ingredient_id__in=totals
+    )
+    items.update(
+        amount=Greatest(F("amount") - amount_case(totals), Value(0))
+    )
+    items.filter(amount=0).delete()
+
+
+def get_expected_totals(user_ids=None, ingredient_ids=None):
+    """
+    Возвращает выборку фактических сумм ингредиентов по пользователям,
+    посчитанных по спискам покупок и ингредиентам рецептов.
+    """
+    totals = IngredientRecipe.objects.filter(recipe__carts__isnull=False)
+    if user_ids is not None:
+        totals = totals.filter(recipe__carts__user_id__in=user_ids)
+    if ingredient_ids is not None:
+        totals = totals.filter(ingredient_id__in=ingredient_ids)
+    return totals.order_by().values(
+        "recipe__carts__user_id", "ingredient_id"
+    ).annotate(total=Sum("amount")).values_list(
+        "recipe__carts__user_id", "ingredient_id", "total"
+    )
+
+
+@transaction.atomic
+def rebuild(user_ids=None, ingredient_ids=None):
+    """
+    Пересчитывает сводные списки покупок пользователей
+    (всех или перечисленных), при необходимости только по
+    перечисленным ингредиентам.
+    """
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    if ingredient_ids is not None:
+        items = items.filter(ingredient_id__in=ingredient_ids)
+    items.delete()
+    ShoppingListItem.objects.bulk_create(
+        (
+            ShoppingListItem(
+                user_id=user_id, ingredient_id=ingredient_id, amount=total
+            )
+            for user_id, ingredient_id, total in get_expected_totals(
+                user_ids, ingredient_ids
+            ).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+def recipe_ingredients_changed(recipe_id, ingredient_ids):
+    """
+    Пересчитывает строки сводных списков покупок по перечисленным
+    ингредиентам для пользователей, у которых рецепт в списке покупок.
+    """
+    user_ids = list(
+        ShoppingCart.objects.filter(recipe_id=recipe_id)
+        .values_list("user_id", flat=True)
+    )
+    if user_ids:
+        rebuild(user_ids, ingredient_ids)
+
+
+def find_drift():
+    """
+    Возвращает количество строк сводных списков покупок,
+    расходящихся с фактическими суммами.
+    """
+    expected = {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in get_expected_totals().iterator()
+    }
+    drift = 0
+    for user_id, ingredient_id, amount in (
+        ShoppingListItem.objects.values_list(
+            "user_id", "ingredient_id", "amount"
+        ).iterator()
+    ):
+        if expected.pop((user_id, ingredient_id), None) != amount:
+            drift += 1
+    return drift + len(expected)
@@ -0,0 +1,138 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from recipes import feeds, images, shopping_lists
+from recipes.counters import increment
+from recipes.tasks import delay
+from recipes.models import (
+    IMAGE_PENDING,
+    Favorite,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart
+)
+from users.models import Subscription, User
+
+COUNTERS = {
+    Favorite: (Recipe, "recipe_id", "favorites_count"),
+    ShoppingCart: (Recipe, "recipe_id", "carts_count"),
+    Recipe: (User, "author_id", "recipes_count"),
+    Subscription: (User, "author_id", "subscribers_count"),
+}
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Subscription)
+def increment_counter(sender, instance, created, raw=False, **kwargs):
+    """
+    Увеличивает денормализованный счётчик при создании объекта.
+    """
+    if not created or raw:
+        return
+    model, fk, field = COUNTERS[sender]
+    increment(model, getattr(instance, fk), field, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Subscription)
+def decrement_counter(sender, instance, **kwargs):
+    """
+    Уменьшает денормализованный счётчик при удалении объекта,
+    в том числе при каскадном удалении.
+    """
+    model, fk, field = COUNTERS[sender]
+    increment(model, getattr(instance, fk), field, -1)
+
+
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+def recipe_ingredient_changed(sender, instance, raw=False, **kwargs):
+    """
+    Обновляет дату изменения рецепта и сводные списки покупок
+    при изменении его ингредиентов.
+    """
+    if raw:
+        return
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        updated_at=timezone.now()
+    )
+    shopping_lists.recipe_ingredients_changed(
+        instance.recipe_id, [instance.ingredient_id]
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_recipe_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Обновляет дату изменения рецептов при изменении их тегов.
+    """
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        recipes = Recipe.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        recipes = Recipe.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        recipes = Recipe.objects.filter(tags=instance)
+    else:
+        return
+    recipes.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(sender, instance, created, raw=False, **kwargs):
+    """
+    Добавляет ингредиенты рецепта в сводный список покупок.
+    """
+    if created and not raw:
+        shopping_lists.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def remove_from_shopping_list(sender, instance, **kwargs):
+    """
+    Вычитает ингредиенты рецепта из сводного списка покупок.
+    """
+    shopping_lists.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, raw=False, **kwargs):
+    """
+    Добавляет новый рецепт в ленты подписчиков автора в фоновом режиме.
+    """
+    if created and not raw:
+        delay(feeds.fan_out, instance.pk)
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_feed(sender, instance, created, raw=False, **kwargs):
+    """
+    Добавляет рецепты автора в ленту нового подписчика в фоновом режиме.
+    """
+    if created and not raw:
+        delay(feeds.backfill, instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def prune_feed(sender, instance, **kwargs):
+    """
+    Удаляет рецепты автора из ленты отписавшегося пользователя.
+    """
+    feeds.prune(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    """
+    Ставит в очередь обработку нового изображения рецепта.
+    """
+    if raw or instance.image_status != IMAGE_PENDING or (
+        update_fields and "image" not in update_fields
+    ):
+        return
+    delay(images.process_image, instance.pk, instance.image.name)
@@ -0,0 +1,47 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """
+    Возвращает пул потоков для фоновых задач, создавая его при первом вызове.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.TASKS_WORKERS,
+            thread_name_prefix="foodgram-task",
+        )
+    return _executor
+
+
+def run(func, *args):
+    """
+    Выполняет задачу в потоке пула и закрывает соединения с базой,
+    открытые этим потоком.
+    """
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Ошибка фоновой задачи %s", func.__name__)
+    finally:
+        connections.close_all()
+
+
+def delay(func, *args):
+    """
+    Ставит задачу в очередь после фиксации текущей транзакции.
+    Если TASKS_ASYNC выключен, задача выполняется синхронно
+    (также после фиксации транзакции).
+    """
+    if settings.TASKS_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(run, func, *args))
+    else:
+        transaction.on_commit(lambda: func(*args))
@@ -33,6 +33,16 @@ class User(AbstractUser):
         max_length=settings.MAX_COUNT_CHARS_ONE_HUNDRED_FIFTY,
         verbose_name="Фамилия"
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество рецептов"
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество подписчиков"
+    )
 
     class Meta:
         """